@@ -0,0 +1,248 @@
+"""Headless batch processing of a directory of scripts
+
+Usage: python batch.py INBOX [--workers 4] [--data-dir DIR] [--journal FILE]
+
+Each .txt, .docx and .pdf script under INBOX goes through the same
+extraction, analysis and audio generation as an upload in the app, and
+is saved as a project named after its path relative to INBOX. Scripts
+run in parallel across a process pool. The provider limits from the
+environment (MAX_TTS_CONCURRENCY, MAX_ANALYSIS_CONCURRENCY and the
+OPENAI_/HUME_ rates and bursts) are split between the workers, so the
+whole run stays within them. Each worker gets at least one request in
+flight.
+
+Finished scripts are appended to a journal. A rerun skips scripts that
+are unchanged since they were saved, and retries the rest. Work that an
+interrupted run already paid for is reused: analyses and clips come back
+from the content-addressed caches under the data directory.
+"""
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+SCRIPT_EXTENSIONS = (".txt", ".docx", ".pdf")
+DEFAULT_WORKERS = min(os.cpu_count() or 2, 4)
+DEFAULT_VOICE = "voice1"
+
+
+class ScriptFile(io.BytesIO):
+    """In-memory stand-in for a Streamlit upload of a script file"""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def find_scripts(inbox):
+    """Relative paths of the scripts under `inbox`, sorted"""
+    scripts = []
+    for root, dirs, files in os.walk(inbox):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in files:
+            if name.lower().endswith(SCRIPT_EXTENSIONS) and not name.startswith("."):
+                scripts.append(os.path.relpath(os.path.join(root, name), inbox).replace(os.sep, "/"))
+    return sorted(scripts)
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()
+
+
+def read_journal(path):
+    """Latest journal entry per script path
+
+    A line cut short by an interruption is ignored.
+    """
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["path"]] = entry
+    return entries
+
+
+def append_journal(path, entry):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, sort_keys=True) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def worker_environment(main, workers):
+    """Environment overrides that give each worker its share of the provider limits"""
+    def share(total):
+        return max(1, int(total) // workers)
+
+    openai, hume = main.PROVIDER_SETTINGS["openai"], main.PROVIDER_SETTINGS["hume"]
+    return {
+        "MAX_TTS_CONCURRENCY": str(share(main.MAX_TTS_CONCURRENCY)),
+        "MAX_ANALYSIS_CONCURRENCY": str(share(main.MAX_ANALYSIS_CONCURRENCY)),
+        "OPENAI_RATE_PER_SECOND": str(openai["rate_per_second"] / workers),
+        "OPENAI_BURST": str(share(openai["burst"])),
+        "HUME_RATE_PER_SECOND": str(hume["rate_per_second"] / workers),
+        "HUME_BURST": str(share(hume["burst"])),
+        # Scripts are already spread over the pool, so PDFs are extracted in-process
+        "PDF_PARALLEL_MIN_PAGES": str(sys.maxsize),
+    }
+
+
+def import_main():
+    """Import the app module without Streamlit's warnings about running outside a server"""
+    from streamlit import config, logger
+
+    # Parsing the config resets the log level, so parse it first
+    config.get_config_options()
+    logger.set_log_level("error")
+
+    import main
+    return main
+
+
+def _init_worker(environment):
+    # main reads its limits when imported, so they must be set first
+    os.environ.update(environment)
+    import_main()
+
+
+def process_script(path, project_name):
+    """Worker task: extract, analyze and voice one script, then save it as a project"""
+    main = import_main()
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        script_file = ScriptFile(os.path.basename(path), f.read())
+
+    script_content = main.process_uploaded_script(script_file)
+    if not script_content or not script_content.strip():
+        raise ValueError("no text could be extracted")
+
+    analysis, dialogues = main.analyze_script(script_content)
+    character_voices = {character: DEFAULT_VOICE for character in analysis.get("characters", [])}
+
+    lines = {dialogue["line_id"]: dialogue for dialogue in dialogues}
+    audio_clips = {}
+    failed = 0
+    for line_id, audio_url, error in main.generate_audio_batch(
+        lines, character_voices, max_workers=main.MAX_TTS_CONCURRENCY
+    ):
+        if error is not None:
+            failed += 1
+            continue
+        dialogue = lines[line_id]
+        voice_id = character_voices.get(dialogue["character"], DEFAULT_VOICE)
+        audio_clips[line_id] = main.make_audio_clip(dialogue, audio_url, voice_id)
+
+    # Partial results are saved too; the rerun that retries them finds the rest cached
+    main.get_project_store().save_project(
+        project_name, script_file.name, analysis, dialogues, audio_clips, character_voices
+    )
+
+    return {
+        "lines": len(dialogues),
+        "clips": len(audio_clips),
+        "failed_lines": failed,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inbox", help="directory of scripts, searched recursively")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="scripts processed at once")
+    parser.add_argument("--data-dir", help="caches and projects (default: SCRIPT_READER_DATA_DIR)")
+    parser.add_argument("--journal", help="progress journal (default: under the data directory)")
+    parser.add_argument("--force", action="store_true", help="reprocess scripts the journal has as done")
+    args = parser.parse_args()
+
+    inbox = os.path.abspath(args.inbox)
+    if not os.path.isdir(inbox):
+        parser.error(f"not a directory: {args.inbox}")
+    if args.data_dir:
+        os.environ["SCRIPT_READER_DATA_DIR"] = os.path.abspath(args.data_dir)
+
+    main = import_main()
+
+    journal = args.journal or os.path.join(
+        main.DATA_DIR, "batches", hashlib.sha1(inbox.encode("utf-8")).hexdigest()[:12] + ".jsonl"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(journal)), exist_ok=True)
+    done = read_journal(journal)
+    store = main.get_project_store()
+
+    pending = []
+    for script in find_scripts(inbox):
+        digest = file_digest(os.path.join(inbox, script))
+        entry = done.get(script)
+        if (not args.force and entry and entry["status"] == "done" and entry["digest"] == digest
+                and store.find_project(entry["project"]) is not None):
+            continue
+        pending.append((script, digest))
+
+    print(f"{len(pending)} scripts to process, journal {journal}", flush=True)
+    if not pending:
+        return 0
+
+    workers = max(1, min(args.workers, len(pending)))
+    failures = 0
+    # Spawned workers start clean instead of inheriting this process's threads
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(worker_environment(main, workers),)
+    )
+    try:
+        futures = {
+            executor.submit(process_script, os.path.join(inbox, script), script): (script, digest)
+            for script, digest in pending
+        }
+        for finished, future in enumerate(as_completed(futures), start=1):
+            script, digest = futures[future]
+            entry = {"path": script, "digest": digest, "project": script,
+                     "finished": datetime.now().isoformat(timespec="seconds")}
+            try:
+                entry.update(future.result())
+            except Exception as e:
+                entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+            else:
+                if entry["failed_lines"]:
+                    entry.update(status="failed", error=f"{entry['failed_lines']} lines had no audio generated")
+                else:
+                    entry["status"] = "done"
+
+            append_journal(journal, entry)
+            if entry["status"] == "done":
+                print(f"[{finished}/{len(pending)}] {script}: {entry['lines']} lines, "
+                      f"{entry['clips']} clips in {entry['seconds']:.1f}s", flush=True)
+            else:
+                failures += 1
+                print(f"[{finished}/{len(pending)}] {script} FAILED: {entry['error']}", flush=True)
+    except KeyboardInterrupt:
+        print("Interrupted; run again to resume")
+        # Scripts in progress are redone next time, mostly from the caches
+        for process in multiprocessing.active_children():
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+    executor.shutdown()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,59 @@
+"""Throughput of dialogue extraction on synthetic screenplays
+
+Usage: python benchmarks/bench_dialogue_extraction.py [--legacy]
+
+--legacy also times the regex extractor that the tokenizer replaced, which
+backtracks heavily on long scripts.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.screenplay_generator import generate_screenplay  # noqa: E402
+import main  # noqa: E402
+
+PAGE_COUNTS = [10, 50, 100, 250, 500]
+
+LEGACY_DIALOGUE_PATTERN = r'([A-Z][A-Z\s]+)(?:\(.*?\))?\n([\s\S]+?)(?=\n\n|\n[A-Z][A-Z\s]+|\Z)'
+
+
+def legacy_extract_dialogue(script_text):
+    return [match.groups() for match in re.finditer(LEGACY_DIALOGUE_PATTERN, script_text)]
+
+
+def best_time(func, arg, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--legacy", action="store_true", help="also time the old regex extractor")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'KiB':>8} {'lines':>7} {'seconds':>9} {'pages/s':>9} {'MiB/s':>7}"
+          + (f" {'legacy s':>9}" if args.legacy else ""))
+
+    for pages in PAGE_COUNTS:
+        script = generate_screenplay(pages)
+        seconds, dialogues = best_time(main.openai_client.extract_dialogue, script)
+        size = len(script.encode("utf-8"))
+
+        row = (f"{pages:>6} {size / 1024:>8.0f} {len(dialogues):>7} {seconds:>9.4f} "
+               f"{pages / seconds:>9.0f} {size / seconds / 2 ** 20:>7.1f}")
+        if args.legacy:
+            legacy_seconds, _ = best_time(legacy_extract_dialogue, script, repeat=1)
+            row += f" {legacy_seconds:>9.4f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,56 @@
+"""Throughput of ProviderTransport against a local rate-limited stub server
+
+Usage: python benchmarks/bench_provider_transport.py [--rate 20] [--requests 200]
+
+Many threads share one transport that is limited to the stub's rate with no
+burst, leaving the stub's burst allowance to absorb network jitter. The
+transport should sustain close to the allowed rate and receive no 429
+responses.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_provider import StubProviderServer  # noqa: E402
+import main  # noqa: E402
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=20.0, help="allowed requests per second")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response latency in seconds")
+    args = parser.parse_args()
+
+    server = StubProviderServer(args.rate, args.burst, latency=args.latency).start()
+    transport = main.ProviderTransport(
+        "stub", server.base_url, rate_per_second=args.rate, burst=1,
+        timeout=10, pool_size=args.workers
+    )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(lambda _: transport.request("POST", "/v0/tts", json={}), range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    stats = transport.stats()
+    achieved = args.requests / elapsed
+    print(f"requests:      {args.requests}")
+    print(f"allowed rate:  {args.rate:.1f}/s")
+    print(f"achieved rate: {achieved:.1f}/s ({achieved / args.rate:.0%} of allowed)")
+    print(f"429 responses: {server.rejected}")
+    print(f"latency p50:   {stats['latency_p50'] * 1000:.0f} ms, p95 {stats['latency_p95'] * 1000:.0f} ms")
+    print(f"queue wait:    {stats['wait_seconds']:.1f} s total")
+
+    return 1 if server.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
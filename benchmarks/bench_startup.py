@@ -0,0 +1,83 @@
+"""Cold-start and rerun time of main.py against a fixed budget
+
+Usage: python benchmarks/bench_startup.py [--reruns 20] [--startup-budget 2.0] [--rerun-budget 0.15]
+
+The app is driven through Streamlit's AppTest harness in a fresh
+interpreter: the first run measures cold start, then every sidebar page is
+rerun repeatedly. Exits non-zero if either budget is exceeded or if a file
+parser was imported without an upload needing it.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+
+PAGES = ["Upload Script", "Script Analysis", "Audio Generation", "Scene Playback", "Project Management"]
+# Imported only once an upload needs them
+LAZY_MODULES = ["lxml", "PyPDF2", "extractors"]
+
+
+def share_script_cache():
+    """Keep compiled bytecode between AppTest runs, as the server does
+
+    AppTest recompiles the script on every run, which would otherwise
+    dominate the measured rerun time.
+    """
+    cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: cache
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20, help="reruns measured per page")
+    parser.add_argument("--startup-budget", type=float,
+                        default=float(os.environ.get("STARTUP_BUDGET_SECONDS", "2.0")))
+    parser.add_argument("--rerun-budget", type=float,
+                        default=float(os.environ.get("RERUN_BUDGET_SECONDS", "0.15")),
+                        help="budget for the p95 rerun time of every page")
+    args = parser.parse_args()
+
+    share_script_cache()
+    app = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    startup = time.perf_counter() - start
+    if app.exception:
+        print(app.exception[0].value)
+        return 1
+
+    failures = []
+    if startup > args.startup_budget:
+        failures.append(f"cold start {startup:.3f}s over {args.startup_budget:.3f}s budget")
+    print(f"cold start: {startup * 1000:.0f} ms (budget {args.startup_budget * 1000:.0f} ms)")
+
+    for page in PAGES:
+        app.sidebar.radio[0].set_value(page).run()
+        timings = []
+        for _ in range(args.reruns):
+            start = time.perf_counter()
+            app.run()
+            timings.append(time.perf_counter() - start)
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        print(f"{page:<20} rerun p50 {statistics.median(timings) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms")
+        if p95 > args.rerun_budget:
+            failures.append(f"{page} rerun p95 {p95:.3f}s over {args.rerun_budget:.3f}s budget")
+
+    eager = [name for name in LAZY_MODULES if name in sys.modules]
+    if eager:
+        failures.append(f"imported without an upload: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
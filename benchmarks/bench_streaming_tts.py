@@ -0,0 +1,61 @@
+"""Time to first audio for streamed speech against a local streaming stub
+
+Usage: python benchmarks/bench_streaming_tts.py [--latency 0.2] [--interval 0.1]
+
+Each line is streamed through `main.stream_speech` from the stub in
+stub_provider.py, which sends its first chunk after `--latency` seconds
+and a further chunk every `--interval` seconds. Time to first audio should
+stay near the stub's latency however long the line is, while the full clip
+takes longer as lines grow. Exits non-zero if a line's first audio arrived
+no sooner than its full clip did.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_provider import StubProviderServer  # noqa: E402
+
+LINE_LENGTHS = [80, 400, 1600]
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="stub delay before the first chunk")
+    parser.add_argument("--interval", type=float, default=0.1, help="stub delay between chunks")
+    parser.add_argument("--chunk-seconds", type=float, default=0.5, help="audio per streamed chunk")
+    args = parser.parse_args()
+
+    server = StubProviderServer(
+        1000, 100, latency=args.latency, stream_chunk_seconds=args.chunk_seconds,
+        stream_interval=args.interval
+    ).start()
+
+    # Route the speech client to the stub and keep clips out of the real cache
+    os.environ["HUME_BASE_URL"] = server.base_url
+    os.environ["HUME_STREAM_HTTP"] = "1"
+    os.environ["SCRIPT_READER_DATA_DIR"] = tempfile.mkdtemp(prefix="script_reader_bench_")
+    import main
+
+    print(f"{'chars':>6} {'audio s':>8} {'first audio ms':>15} {'full clip ms':>13}")
+    failures = 0
+    for length in LINE_LENGTHS:
+        text = ("We don't have much time. " * (length // 25 + 1))[:length]
+        start = time.perf_counter()
+        audio, first_audio = main.stream_speech(text, "HERO", "neutral", f"bench-{length}")
+        total = time.perf_counter() - start
+        seconds = (len(audio) - 44) / (2 * main.hume_client.sample_rate)
+
+        print(f"{length:>6} {seconds:>8.1f} {first_audio * 1000:>15.0f} {total * 1000:>13.0f}")
+        if first_audio >= total and total > args.latency + args.interval:
+            failures += 1
+
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,250 @@
+"""Benchmark suite for script extraction and audio generation
+
+Usage: python benchmarks/bench_suite.py [--pages 10 50 100] [--tts-latency 0.05]
+                                        [--save-baseline] [--output results.json]
+
+Times `extract_text_from_docx` (next to a python-docx object model
+reference), `extract_text_from_pdf` and `extract_dialogue` on synthetic
+screenplays of each page count (failing if the TXT, DOCX and PDF versions
+give different dialogue counts), and
+`generate_audio_batch` against mock clients with the given latency, first
+uncached and then fully cached, and `render_clip_effects` over a scene of
+clips with speed, volume and SFX set. Results are written as JSON. When a
+baseline file exists, each case is compared against it and the run exits
+non-zero if any case is slower than its group's tolerance allows.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.screenplay_generator import generate_screenplay, generate_screenplay_file  # noqa: E402
+
+PAGE_COUNTS = [10, 50, 100, 250, 500]
+RESULTS_FORMAT_VERSION = 1
+
+# Fraction by which a case may be slower than its baseline before it counts as a regression
+REGRESSION_TOLERANCE = {
+    "extract_text_from_docx": 0.35,
+    "docx_object_model": 0.35,
+    "extract_text_from_pdf": 0.5,
+    "extract_dialogue": 0.25,
+    "generate_audio_batch": 0.5,
+    "generate_audio_batch_cached": 0.5,
+    "render_clip_effects": 0.5,
+}
+# Differences below this are timer noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.02
+
+
+def best_time(func, repeat):
+    """Fastest of `repeat` calls to `func`, with the last call's result"""
+    timings = []
+    result = None
+    for attempt in range(repeat):
+        start = time.perf_counter()
+        result = func(attempt)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def docx_object_model_text(data):
+    """Paragraph text via the full python-docx object model, for comparison"""
+    import docx
+    return "\n".join(paragraph.text for paragraph in docx.Document(io.BytesIO(data)).paragraphs)
+
+
+def bench_extraction(main, pages, repeat):
+    """Cases for the file extractors and dialogue extraction at one page count"""
+    docx_bytes = generate_screenplay_file(pages, "docx")
+    pdf_bytes = generate_screenplay_file(pages, "pdf")
+    script = generate_screenplay(pages)
+
+    cases = {}
+    seconds, docx_text = best_time(lambda _: main.extract_text_from_docx(io.BytesIO(docx_bytes)), repeat)
+    cases[f"extract_text_from_docx/{pages}p"] = {
+        "group": "extract_text_from_docx", "seconds": seconds,
+        "bytes": len(docx_bytes), "pages_per_second": pages / seconds,
+    }
+
+    seconds, _ = best_time(lambda _: docx_object_model_text(docx_bytes), repeat)
+    cases[f"docx_object_model/{pages}p"] = {
+        "group": "docx_object_model", "seconds": seconds,
+        "bytes": len(docx_bytes), "pages_per_second": pages / seconds,
+    }
+
+    seconds, pdf_text = best_time(lambda _: main.extract_text_from_pdf(io.BytesIO(pdf_bytes)), repeat)
+    cases[f"extract_text_from_pdf/{pages}p"] = {
+        "group": "extract_text_from_pdf", "seconds": seconds,
+        "bytes": len(pdf_bytes), "pages_per_second": pages / seconds,
+    }
+
+    seconds, dialogues = best_time(lambda _: main.openai_client.extract_dialogue(script), repeat)
+    cases[f"extract_dialogue/{pages}p"] = {
+        "group": "extract_dialogue", "seconds": seconds,
+        "bytes": len(script.encode("utf-8")), "pages_per_second": pages / seconds,
+        "lines": len(dialogues),
+    }
+
+    # Timings are only comparable if every format yields the same script
+    for file_format, text in [("docx", docx_text), ("pdf", pdf_text)]:
+        count = len(main.openai_client.extract_dialogue(text))
+        if count != len(dialogues):
+            raise AssertionError(
+                f"{pages}-page {file_format} script gave {count} dialogue lines, txt gave {len(dialogues)}"
+            )
+    return cases
+
+
+def bench_audio_batch(main, line_count, workers, repeat):
+    """Cases for batch audio generation, uncached and then served from the TTS cache"""
+    dialogues = main.assign_line_ids(main.openai_client.extract_dialogue(generate_screenplay(100)))
+    lines = {dialogue["line_id"]: dialogue for dialogue in dialogues[:line_count]}
+    characters = {dialogue["character"] for dialogue in lines.values()}
+
+    def generate(voice):
+        voices = {character: voice for character in characters}
+        results = list(main.generate_audio_batch(lines, voices, max_workers=workers))
+        errors = [error for _, _, error in results if error is not None]
+        if errors:
+            raise errors[0]
+        return results
+
+    # A fresh voice per attempt keeps every line a cache miss
+    seconds, _ = best_time(lambda attempt: generate(f"bench-voice-{attempt}"), repeat)
+    cases = {
+        f"generate_audio_batch/{len(lines)}l": {
+            "group": "generate_audio_batch", "seconds": seconds, "lines_per_second": len(lines) / seconds,
+        }
+    }
+
+    seconds, _ = best_time(lambda _: generate("bench-voice-0"), repeat)
+    cases[f"generate_audio_batch_cached/{len(lines)}l"] = {
+        "group": "generate_audio_batch_cached", "seconds": seconds, "lines_per_second": len(lines) / seconds,
+    }
+    return cases
+
+
+def bench_clip_effects(main, clip_count, repeat):
+    """Case for rendering playback effects onto a scene's clips, uncached"""
+    dialogues = main.assign_line_ids(main.openai_client.extract_dialogue(generate_screenplay(20)))[:clip_count]
+    clips = [
+        main.make_audio_clip(dialogue, main.hume_client.generate_speech(dialogue["text"], dialogue["character"]), "voice1")
+        for dialogue in dialogues
+    ]
+    audio_seconds = sum(len(main.decode_wav(clip["url"])[0]) / main.hume_client.sample_rate for clip in clips)
+
+    # A different volume per attempt keeps every variant a cache miss
+    def render(attempt):
+        effects = {"speed": 1.3, "volume": 0.9 - 0.01 * attempt, "sfx": ["Rain", "Crowd"]}
+        return main.render_clip_effects([{**clip, "effects": effects} for clip in clips])
+
+    seconds, _ = best_time(render, repeat)
+    return {
+        f"render_clip_effects/{len(clips)}l": {
+            "group": "render_clip_effects", "seconds": seconds, "lines_per_second": len(clips) / seconds,
+            "realtime_factor": audio_seconds / seconds,
+        }
+    }
+
+
+def find_regressions(cases, baseline):
+    """Describe each case that is slower than its baseline allows"""
+    regressions = []
+    for name, case in cases.items():
+        previous = baseline.get("cases", {}).get(name)
+        if previous is None:
+            continue
+        allowed = previous["seconds"] * (1 + REGRESSION_TOLERANCE[case["group"]])
+        if case["seconds"] > allowed and case["seconds"] - previous["seconds"] > MIN_REGRESSION_SECONDS:
+            regressions.append(
+                f"{name}: {case['seconds']:.4f}s vs baseline {previous['seconds']:.4f}s "
+                f"(+{case['seconds'] / previous['seconds'] - 1:.0%}, tolerance "
+                f"{REGRESSION_TOLERANCE[case['group']]:.0%})"
+            )
+    return regressions
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=PAGE_COUNTS)
+    parser.add_argument("--repeat", type=int, default=5, help="attempts per case; the fastest counts")
+    parser.add_argument("--tts-latency", type=float, default=0.05, help="mock TTS latency in seconds")
+    parser.add_argument("--tts-lines", type=int, default=200, help="lines per audio batch")
+    parser.add_argument("--tts-workers", type=int, default=8)
+    parser.add_argument("--effects-lines", type=int, default=40, help="clips per scene for effects rendering")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(ROOT, "benchmarks", "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    args = parser.parse_args()
+
+    # Keep benchmark clips out of the real TTS cache, and don't let the
+    # provider rate limit cap the measured throughput
+    os.environ["SCRIPT_READER_DATA_DIR"] = tempfile.mkdtemp(prefix="script_reader_bench_")
+    os.environ.setdefault("HUME_RATE_PER_SECOND", "100000")
+    os.environ.setdefault("HUME_BURST", "1000")
+
+    import main
+    main.hume_client = main.HumeAIClient(latency=args.tts_latency)
+
+    cases = {}
+    for pages in args.pages:
+        cases.update(bench_extraction(main, pages, args.repeat))
+    cases.update(bench_audio_batch(main, args.tts_lines, args.tts_workers, args.repeat))
+    cases.update(bench_clip_effects(main, args.effects_lines, args.repeat))
+
+    results = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "repeat": args.repeat,
+            "tts_latency": args.tts_latency,
+            "tts_workers": args.tts_workers,
+        },
+        "cases": cases,
+    }
+
+    print(f"{'case':<40} {'seconds':>9} {'throughput':>16}")
+    for name, case in cases.items():
+        if "pages_per_second" in case:
+            throughput = f"{case['pages_per_second']:.0f} pages/s"
+        else:
+            throughput = f"{case['lines_per_second']:.0f} lines/s"
+        print(f"{name:<40} {case['seconds']:>9.4f} {throughput:>16}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = find_regressions(cases, json.load(f))
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,168 @@
+"""Deterministic synthetic screenplays for benchmarks, as TXT, DOCX or PDF"""
+import io
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+# Roughly what fits on one page of a standard screenplay
+LINES_PER_PAGE = 55
+
+CHARACTERS = ["JOHN", "SARAH", "DETECTIVE MILLER", "BARTENDER", "MRS. O'HARA", "KID #2"]
+LOCATIONS = ["BAR", "ALLEY", "POLICE STATION", "APARTMENT", "ROOFTOP", "DINER"]
+TIMES = ["NIGHT", "DAY", "CONTINUOUS", "LATER"]
+EXTENSIONS = ["", "", "", " (V.O.)", " (O.S.)", " (CONT'D)"]
+PARENTHETICALS = ["(quietly)", "(beat)", "(angry)", "(into phone)"]
+# Indents, in Courier characters from the action margin, of a screenplay's
+# dialogue, parentheticals and character cues (1.0", 1.6" and 2.2")
+DIALOGUE_INDENT = 10
+PARENTHETICAL_INDENT = 16
+CUE_INDENT = 22
+WORDS = (
+    "we don't have much time the bomb is counting down trust me I have been "
+    "in worse situations than this one where were you last night nobody saw "
+    "anything the rain keeps falling and the city never sleeps"
+).split()
+
+
+def _sentence(rng, min_words=4, max_words=14):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + rng.choice([".", "?", "!", "..."])
+
+
+def generate_screenplay(pages, seed=0):
+    """Return screenplay text of about `pages` pages
+
+    The same (pages, seed) pair always produces the same script.
+    """
+    return "\n".join(text for _, text in _screenplay_lines(pages, seed)) + "\n"
+
+
+def _screenplay_lines(pages, seed):
+    """(indent, text) for each line of `generate_screenplay(pages, seed)`"""
+    rng = random.Random(seed)
+    target_lines = pages * LINES_PER_PAGE
+    lines = []
+    scene = 0
+
+    while len(lines) < target_lines:
+        if scene == 0 or rng.random() < 0.08:
+            scene += 1
+            prefix = rng.choice(["INT.", "EXT."])
+            lines += [(0, f"{prefix} {rng.choice(LOCATIONS)} - {rng.choice(TIMES)}"), (0, "")]
+
+        if rng.random() < 0.3:
+            lines += [(0, _sentence(rng, 8, 20)), (0, "")]
+            continue
+
+        lines.append((CUE_INDENT, rng.choice(CHARACTERS) + rng.choice(EXTENSIONS)))
+        if rng.random() < 0.25:
+            lines.append((PARENTHETICAL_INDENT, rng.choice(PARENTHETICALS)))
+        for _ in range(rng.randint(1, 4)):
+            lines.append((DIALOGUE_INDENT, _sentence(rng)))
+        lines.append((0, ""))
+
+    return lines[:target_lines]
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def screenplay_docx(pages, seed=0):
+    """`generate_screenplay` as .docx bytes, one paragraph per line
+
+    The package is written directly, since python-docx slows down
+    noticeably as documents grow to hundreds of pages.
+    """
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' if line else "<w:p/>"
+        for line in generate_screenplay(pages, seed).splitlines()
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        # Fixed timestamps keep the output byte-for-byte deterministic
+        for name, data in [("[Content_Types].xml", DOCX_CONTENT_TYPES),
+                           ("_rels/.rels", DOCX_RELATIONSHIPS),
+                           ("word/document.xml", document)]:
+            archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data,
+                             compress_type=zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def screenplay_pdf(pages, seed=0):
+    """`generate_screenplay` as .pdf bytes, LINES_PER_PAGE lines per page
+
+    Written directly in PDF syntax with the built-in Courier font, so no PDF
+    library is needed to produce it. Cues, parentheticals and dialogue are
+    indented with spaces, as a plain-text screenplay prints; like most PDF
+    text, the extracted lines have no blank lines between elements.
+    """
+    lines = [" " * indent + text for indent, text in _screenplay_lines(pages, seed)]
+    page_lines = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    # Objects 1-3 are the catalog, page tree and font; each page adds a page and a content stream
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(page_lines)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(page_lines)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>",
+    ]
+    for i, text_lines in enumerate(page_lines):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        content = "BT /F1 12 Tf 12 TL 72 740 Td " + " ".join(
+            f"{_pdf_string(line)} '" for line in text_lines
+        ) + " ET"
+        stream = content.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def generate_screenplay_file(pages, file_format, seed=0):
+    """Screenplay of about `pages` pages as file bytes in `file_format` (txt, docx or pdf)"""
+    if file_format == "txt":
+        return generate_screenplay(pages, seed).encode("utf-8")
+    if file_format == "docx":
+        return screenplay_docx(pages, seed)
+    if file_format == "pdf":
+        return screenplay_pdf(pages, seed)
+    raise ValueError(f"Unsupported file format: {file_format}")
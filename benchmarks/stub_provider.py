@@ -0,0 +1,108 @@
+"""Local stand-in for a rate-limited provider API
+
+Answers every request after a fixed latency, and with 429 Too Many Requests
+whenever callers exceed `rate_per_second` (token bucket of `burst` tokens).
+POST /v0/tts/stream/file streams 16-bit mono PCM for the requested text:
+the first chunk after `latency`, then one chunk of `stream_chunk_seconds`
+of audio every `stream_interval` seconds.
+"""
+import json
+import math
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    # Audio length per character of text, as the mock speech client assumes
+    SECONDS_PER_CHAR = 0.06
+    SAMPLE_RATE = 16000
+
+    def __init__(self, rate_per_second, burst, latency=0.05, port=0,
+                 stream_chunk_seconds=0.5, stream_interval=0.1):
+        super().__init__(("127.0.0.1", port), StubProviderHandler)
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.latency = latency
+        self.stream_chunk_seconds = stream_chunk_seconds
+        self.stream_interval = stream_interval
+        self.accepted = 0
+        self.rejected = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def take_token(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.accepted += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if not self.server.take_token():
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        time.sleep(self.server.latency)
+
+        if self.path.startswith("/v0/tts/stream"):
+            self.stream_speech(json.loads(body or b"{}"))
+            return
+
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST
+
+    def stream_speech(self, request):
+        """Send PCM chunk by chunk; without a Content-Length the body ends when the connection closes"""
+        text = " ".join(u.get("text", "") for u in request.get("utterances", []))
+        total_seconds = max(0.5, self.server.SECONDS_PER_CHAR * len(text))
+        chunk_frames = int(self.server.stream_chunk_seconds * self.server.SAMPLE_RATE)
+        total_frames = int(total_seconds * self.server.SAMPLE_RATE)
+
+        self.send_response(200)
+        self.send_header("Content-Type", f"audio/L16; rate={self.server.SAMPLE_RATE}")
+        self.end_headers()
+
+        for start in range(0, total_frames, chunk_frames):
+            if start:
+                time.sleep(self.server.stream_interval)
+            frames = range(start, min(start + chunk_frames, total_frames))
+            pcm = struct.pack(
+                f"<{len(frames)}h",
+                *(int(6000 * math.sin(2 * math.pi * 220 * i / self.server.SAMPLE_RATE)) for i in frames)
+            )
+            self.wfile.write(pcm)
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
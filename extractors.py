@@ -0,0 +1,164 @@
+"""Script text extraction that runs outside the Streamlit script thread
+
+Functions that execute in worker processes live here rather than in
+main.py, because Streamlit runs main.py as `__main__` and process pools can
+only dispatch functions from importable modules.
+"""
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+
+import PyPDF2
+from lxml import etree
+
+# Number of consecutive pages each worker extracts per task
+PDF_PAGE_BATCH_SIZE = int(os.environ.get("PDF_PAGE_BATCH_SIZE", "8"))
+# Shorter documents are extracted in-process, where pool overhead would dominate
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+
+# WordprocessingML namespaces: transitional (what Word writes) and strict OOXML
+WORD_NAMESPACES = (
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main",
+)
+DOCX_DEFAULT_MAIN_PART = "word/document.xml"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Reader cached per worker process so consecutive batches skip re-parsing,
+# keyed by (path, mtime) so a reused temp file name is never served stale
+_worker_reader_key = None
+_worker_reader = None
+
+
+def _get_pool():
+    """Process pool shared by every extraction in this server process"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers avoid forking a multi-threaded Streamlit server
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _extract_page_range(path, start, stop):
+    """Worker task: extract text for pages [start, stop) of the PDF at `path`"""
+    global _worker_reader_key, _worker_reader
+    key = (path, os.stat(path).st_mtime_ns)
+    if _worker_reader_key != key:
+        # Drop the previous document before parsing the next one
+        _worker_reader_key = _worker_reader = None
+        _worker_reader = PyPDF2.PdfReader(path)
+        _worker_reader_key = key
+
+    return [_worker_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(data, batch_size=PDF_PAGE_BATCH_SIZE):
+    """Yield (page_index, total_pages, text) for each page of a PDF, in order
+
+    Pages are extracted in batches across a process pool. Each page is
+    yielded as soon as it and every page before it are done, so callers can
+    start parsing early pages while later ones are still being extracted.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    total = len(reader.pages)
+
+    if total < PDF_PARALLEL_MIN_PAGES:
+        for i, page in enumerate(reader.pages):
+            yield i, total, page.extract_text() or ""
+        return
+
+    # Workers read the document from disk instead of receiving it per task
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+        path = tmp.name
+
+    futures = {}
+    try:
+        pool = _get_pool()
+        for start in range(0, total, batch_size):
+            future = pool.submit(_extract_page_range, path, start, min(start + batch_size, total))
+            futures[future] = start
+
+        ready = {}
+        next_page = 0
+        for future in as_completed(futures):
+            start = futures[future]
+            for offset, text in enumerate(future.result()):
+                ready[start + offset] = text
+
+            while next_page in ready:
+                yield next_page, total, ready.pop(next_page)
+                next_page += 1
+    finally:
+        # cancel() leaves batches already running, which still read the file
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        os.unlink(path)
+
+
+def _docx_main_part(archive):
+    """Zip member holding the document body, as named by the package relationships"""
+    try:
+        rels = etree.fromstring(archive.read("_rels/.rels"), etree.XMLParser(resolve_entities=False))
+    except KeyError:
+        return DOCX_DEFAULT_MAIN_PART
+
+    for rel in rels:
+        if rel.get("Type", "").endswith("/officeDocument") and rel.get("Target"):
+            return rel.get("Target").lstrip("/")
+    return DOCX_DEFAULT_MAIN_PART
+
+
+def _docx_paragraph_text(paragraph, ns):
+    """Text of a w:p element, with tabs and line breaks as python-docx renders them"""
+    parts = []
+    for node in paragraph.iter(f"{{{ns}}}t", f"{{{ns}}}tab", f"{{{ns}}}br",
+                               f"{{{ns}}}cr", f"{{{ns}}}noBreakHyphen"):
+        local = node.tag[len(ns) + 2:]
+        if local == "t":
+            parts.append(node.text or "")
+        elif local == "tab":
+            parts.append("\t")
+        elif local == "noBreakHyphen":
+            parts.append("-")
+        elif local == "cr" or node.get(f"{{{ns}}}type", "textWrapping") == "textWrapping":
+            # Page and column breaks end no line of text
+            parts.append("\n")
+    return "".join(parts)
+
+
+def iter_docx_paragraphs(data):
+    """Yield the text of each paragraph of a .docx, in document order
+
+    The document XML is parsed incrementally straight out of the zip,
+    and each element is discarded once read, so memory stays flat however
+    long the draft is. Paragraphs in tables are yielded where the table
+    sits, cell by cell along each row, so dual dialogue set in two columns
+    reads left speaker first, then right.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        with archive.open(_docx_main_part(archive)) as xml:
+            tags = [f"{{{ns}}}{local}" for ns in WORD_NAMESPACES for local in ("p", "tbl")]
+            for _, element in etree.iterparse(xml, events=("end",), tag=tags,
+                                              resolve_entities=False, no_network=True):
+                ns, local = element.tag[1:].split("}")
+                if local == "p":
+                    yield _docx_paragraph_text(element, ns)
+
+                # Paragraphs and tables are complete here; drop them and
+                # anything already read before them
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
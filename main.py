@@ -1,24 +1,493 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import io
 import os
 import json
 import base64
+import bisect
+import copy
+import difflib
+import functools
+import hashlib
+import heapq
+import itertools
+import sqlite3
+import threading
+import tempfile
 import uuid
+import wave
+import zipfile
 from datetime import datetime
-import docx
-import PyPDF2
+import numpy as np
+import requests
 import time
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from typing import Dict, List, Tuple, Any, Optional
 
+from requests.adapters import HTTPAdapter
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from tenacity import Retrying, stop_after_attempt, stop_when_event_set, wait_exponential
+
+from provider_errors import CircuitOpenError, ProviderError
+
+# Upper bound on speech requests in flight during batch generation
+MAX_TTS_CONCURRENCY = int(os.environ.get("MAX_TTS_CONCURRENCY", "8"))
+TTS_MAX_ATTEMPTS = int(os.environ.get("TTS_MAX_ATTEMPTS", "4"))
+
+# Background audio generation jobs allowed to run at once per server process
+MAX_RUNNING_AUDIO_JOBS = int(os.environ.get("MAX_RUNNING_AUDIO_JOBS", "2"))
+AUDIO_JOB_RETENTION_SECONDS = 6 * 60 * 60
+
+# Speculative generation of lines a user is about to reach
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", "2"))
+# Lines each session may have queued or in flight at once
+PREFETCH_BUDGET_LINES = int(os.environ.get("PREFETCH_BUDGET_LINES", "12"))
+# Lines after a just-generated line that are prefetched
+PREFETCH_AHEAD_LINES = int(os.environ.get("PREFETCH_AHEAD_LINES", "5"))
+
+# Location of persistent caches shared by every session of the deployment
+DATA_DIR = os.environ.get(
+    "SCRIPT_READER_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".script_reader")
+)
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+SCENE_TRACK_CACHE_MAX_BYTES = int(os.environ.get("SCENE_TRACK_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# Audio frames copied per read when assembling scene tracks
+TRACK_BLOCK_FRAMES = 16384
+
+# Playback effects a clip has until the user changes its Advanced Options
+DEFAULT_CLIP_EFFECTS = {"speed": 1.0, "volume": 1.0, "sfx": []}
+# Time-stretch analysis frame; consecutive output frames overlap by half
+STRETCH_FRAME_SECONDS = 0.04
+# Peak level of a background SFX bed, relative to full scale
+SFX_BED_GAIN = 0.12
+SFX_BED_SECONDS = 8
+# Per bed: spectral shape of its noise (by frequency in Hz), and the depth and
+# cycles per loop of its swell
+SFX_BED_SHAPES = {
+    "Rain": (lambda f: f / (f + 2000), 0.0, 1),
+    "City Noise": (lambda f: 1 / (1 + f / 150), 0.3, 1),
+    "Wind": (lambda f: 1 / (1 + (f / 400) ** 2), 0.7, 2),
+    "Crowd": (lambda f: f / (f + 300) / (1 + f / 3000), 0.4, 32),
+}
+VARIANT_CACHE_MAX_BYTES = int(os.environ.get("VARIANT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Part of every variant's cache key; bump it when rendering changes
+EFFECTS_ENGINE_VERSION = 1
+
+# Longest analysis chunk; longer scripts are split into chunks of whole scenes
+ANALYSIS_CHUNK_CHARS = int(os.environ.get("ANALYSIS_CHUNK_CHARS", "20000"))
+MAX_ANALYSIS_CONCURRENCY = int(os.environ.get("MAX_ANALYSIS_CONCURRENCY", "4"))
+# Share of scenes two drafts must have in common to reuse the earlier analysis
+REVISION_MIN_SIMILARITY = float(os.environ.get("REVISION_MIN_SIMILARITY", "0.5"))
+
+# Shared transport settings per API provider; rates are requests per second
+PROVIDER_SETTINGS = {
+    "openai": {
+        "base_url": os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        "headers": {"Authorization": f"Bearer {os.environ['OPENAI_API_KEY']}"} if os.environ.get("OPENAI_API_KEY") else {},
+        "rate_per_second": float(os.environ.get("OPENAI_RATE_PER_SECOND", "3")),
+        "burst": int(os.environ.get("OPENAI_BURST", "1")),
+        "timeout": float(os.environ.get("OPENAI_TIMEOUT", "120")),
+        "pool_size": MAX_ANALYSIS_CONCURRENCY
+    },
+    "hume": {
+        "base_url": os.environ.get("HUME_BASE_URL", "https://api.hume.ai"),
+        "headers": {"X-Hume-Api-Key": os.environ["HUME_API_KEY"]} if os.environ.get("HUME_API_KEY") else {},
+        "rate_per_second": float(os.environ.get("HUME_RATE_PER_SECOND", "10")),
+        "burst": int(os.environ.get("HUME_BURST", "1")),
+        "timeout": float(os.environ.get("HUME_TIMEOUT", "60")),
+        "pool_size": MAX_TTS_CONCURRENCY * MAX_RUNNING_AUDIO_JOBS
+    }
+}
+# Stream speech from the provider's streaming endpoint instead of the local mock
+HUME_STREAM_HTTP = os.environ.get("HUME_STREAM_HTTP", "0") == "1"
+STREAM_READ_BYTES = 8192
+# Streamed audio is handed to the player in segments of at least this length
+STREAM_SEGMENT_SECONDS = float(os.environ.get("STREAM_SEGMENT_SECONDS", "1.0"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+# Provider clients and the voice catalog are rebuilt after this many seconds
+PROVIDER_CLIENT_TTL_SECONDS = int(os.environ.get("PROVIDER_CLIENT_TTL_SECONDS", "3600"))
+VOICE_CATALOG_TTL_SECONDS = int(os.environ.get("VOICE_CATALOG_TTL_SECONDS", "3600"))
+
+EMOTIONS = ["neutral", "happy", "sad", "angry", "fearful", "surprised"]
+DIALOGUE_PAGE_SIZES = [25, 50, 100]
+AUDIO_JOBS_SHOWN = 5
+
+# Project archive (.srproj) identification
+PROJECT_ARCHIVE_FORMAT = "script-reader-project"
+PROJECT_ARCHIVE_VERSION = 1
+
+# Timing spans are recorded only while enabled; the diagnostics page can flip this at runtime
+TIMINGS_ENABLED = os.environ.get("SCRIPT_READER_TIMINGS", "0") == "1"
+# Upper bounds, in seconds, of the span duration histogram buckets
+TIMING_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Dialogue search: words are runs of letters and digits, with inner apostrophes
+SEARCH_TOKEN_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+SEARCH_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Screenplay element patterns, applied to one stripped line at a time
+SCENE_HEADING_PATTERN = re.compile(r'(?:INT\.?/EXT|INT|EXT|EST|I/E)[.\s]')
+# Names start with a letter in any script, like "ÉLODIE", and may number a role, like "KID #2"
+CHARACTER_CUE_PATTERN = re.compile(r"([^\W\d_](?:[^\W_]|[ .'&#-])*)(\(.*\))?")
+MAX_CHARACTER_CUE_LENGTH = 40
+
+
+def parse_character_cue(line):
+    """Return the speaker name if `line` looks like a character cue, else None
+
+    Cues are short, upper-case lines optionally followed by an extension
+    such as (V.O.) or (CONT'D). Transitions like "CUT TO:" don't match.
+    """
+    if len(line) > MAX_CHARACTER_CUE_LENGTH:
+        return None
+
+    match = CHARACTER_CUE_PATTERN.fullmatch(line)
+    if match is None:
+        return None
+
+    name = match.group(1).strip()
+    return None if any(c.islower() for c in name) else name
+
+
+def tokenize_screenplay(script_text):
+    """Split a screenplay into (kind, text) tokens in a single pass
+
+    Kinds are "scene_heading", "character", "parenthetical", "dialogue" and
+    "action". Each line is classified once with anchored patterns and one
+    line of lookahead, so the cost is linear in the length of the script.
+
+    A speech ends at a blank line, a scene heading, or a line indented less
+    than its dialogue. Inside a speech, a line that looks like a cue starts
+    a new speech only if it is indented further than the dialogue or, in
+    unindented text, if the script doesn't separate elements with blank
+    lines. Text extracted from PDFs has next to none, so there a new cue
+    may follow the previous speech directly.
+    """
+    lines = script_text.splitlines()
+    # Typed scripts have a blank line every few lines; PDF text has a stray few at most
+    blank_separated = sum(1 for line in lines if not line.strip()) * 10 >= len(lines)
+    in_dialogue = False
+    # Whether the current speech has a line of dialogue yet, and its indent
+    spoken = False
+    speech_indent = 0
+
+    for i, raw_line in enumerate(lines):
+        line = raw_line.strip()
+
+        if not line:
+            in_dialogue = False
+            continue
+
+        if SCENE_HEADING_PATTERN.match(line):
+            in_dialogue = False
+            yield "scene_heading", line
+            continue
+
+        indent = len(raw_line) - len(raw_line.lstrip())
+        if in_dialogue and spoken and indent < speech_indent:
+            in_dialogue = False
+
+        if in_dialogue and line.startswith("("):
+            yield "parenthetical", line
+            continue
+
+        # A cue must be followed by the speech it introduces, and never
+        # directly follows a cue without any speech in between
+        speaker = None
+        if not in_dialogue or (spoken and (indent > speech_indent if speech_indent else not blank_separated)):
+            speaker = parse_character_cue(line)
+
+        if speaker and i + 1 < len(lines) and lines[i + 1].strip():
+            in_dialogue = True
+            spoken = False
+            yield "character", speaker
+        elif in_dialogue:
+            if not spoken:
+                spoken = True
+                speech_indent = indent
+            yield "dialogue", line
+        else:
+            yield "action", line
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter
+
+    Holds up to `capacity` tokens and refills at `rate` tokens per second.
+    `acquire` blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting if necessary; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Hand out no tokens for `seconds`, e.g. after the server sent a 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class CircuitBreaker:
+    """Stops calling a provider after repeated consecutive failures
+
+    Opens after `failure_threshold` failures in a row and rejects calls for
+    `reset_timeout` seconds. It then lets a single trial call through
+    (half-open) and closes again if that call succeeds.
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self._trial_in_flight = False
+
+            if self.state == "half-open":
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+                return True
+
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half-open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+def is_provider_failure(error):
+    """Whether `error` means the provider is unhealthy, rather than the request was bad
+
+    Timeouts, connection errors, 5xx responses and 429s count against the
+    circuit breaker. Client errors like a 400 are the caller's problem and
+    must not pause the provider for every session.
+    """
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class ProviderTransport:
+    """Shared call path for one API provider
+
+    Every call is rate limited by a token bucket, guarded by a circuit
+    breaker and timed. HTTP requests go through a pooled `requests.Session`
+    with a default timeout, and 429 responses pause the bucket for the
+    server's Retry-After period.
+    """
+
+    def __init__(self, provider, base_url, headers=None, rate_per_second=5.0, burst=5,
+                 timeout=60.0, pool_size=10, breaker=None):
+        self.provider = provider
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._counters = {"calls": 0, "errors": 0, "rejected": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def call(self, func, *args, **kwargs):
+        """Run `func` under this provider's rate limit and circuit breaker"""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.provider} is failing; calls are paused for up to {self.breaker.reset_timeout:.0f}s")
+
+        self._count("wait_seconds", self.rate_limiter.acquire())
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_provider_failure(e):
+                self.breaker.record_failure()
+            else:
+                # The provider answered, so a half-open trial still closes the circuit
+                self.breaker.record_success()
+            self._record(time.perf_counter() - start, error=True)
+            raise
+
+        self.breaker.record_success()
+        self._record(time.perf_counter() - start)
+        return result
+
+    def request(self, method, path, **kwargs):
+        """Send an HTTP request to the provider and return the response"""
+        kwargs.setdefault("timeout", self.timeout)
+
+        def send():
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            if response.status_code == 429:
+                self._count("throttled")
+                try:
+                    retry_after = float(response.headers.get("Retry-After", "1"))
+                except ValueError:
+                    retry_after = 1.0
+                self.rate_limiter.pause(retry_after)
+            response.raise_for_status()
+            return response
+
+        return self.call(send)
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _record(self, latency, error=False):
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["errors"] += int(error)
+            self._latencies.append(latency)
+
+    def stats(self):
+        """Call counts, latency percentiles (seconds) and breaker state"""
+        with self._lock:
+            stats = dict(self._counters)
+            latencies = sorted(self._latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        stats.update({
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+            "circuit": self.breaker.state
+        })
+        return stats
+
+
+@st.cache_resource(show_spinner=False)
+def get_provider_transport(provider):
+    """Transport for `provider`, shared by all sessions and reruns"""
+    return ProviderTransport(provider, **PROVIDER_SETTINGS[provider])
+
+
+class SingleFlight:
+    """Merges concurrent identical calls into a single call
+
+    The first caller for a key makes the call. Callers arriving while it is
+    in flight wait for it and receive a copy of its result, or its
+    exception, so identical requests from different sessions cost one
+    upstream call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = {"done": threading.Event(), "result": None, "error": None}
+            self._counters["calls" if leader else "shared"] += 1
+
+        if not leader:
+            flight["done"].wait()
+            if flight["error"] is not None:
+                raise flight["error"]
+            # Waiters in other sessions mustn't share mutable results
+            return copy.deepcopy(flight["result"])
+
+        try:
+            flight["result"] = func(*args, **kwargs)
+            return flight["result"]
+        except Exception as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight["done"].set()
+
+    def stats(self):
+        """Calls made, calls saved by joining one in flight, and calls in flight now"""
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._flights))
+
+
+@st.cache_resource(show_spinner=False)
+def get_single_flight(name):
+    """Single-flight group `name`, shared by all sessions and reruns"""
+    return SingleFlight()
+
+
 # Mock imports for APIs that will be implemented in production
 # Replace these with actual API implementations
 class OpenAIClient:
+    # Bump whenever analysis or dialogue extraction output changes
+    analyzer_version = "mock-3"
+
+    def __init__(self, latency=1.0):
+        self.transport = get_provider_transport("openai")
+        # Simulated API response time, in seconds
+        self.latency = latency
+
     def analyze_script(self, script_text):
         """Mock function for script analysis with OpenAI"""
-        # In production, this would call OpenAI API
-        time.sleep(1)  # Simulate API call
+        # In production, this would call OpenAI API via self.transport.request
+        self.transport.call(time.sleep, self.latency)  # Simulate API call
         
         # Mock script analysis response
         characters = ["JOHN", "SARAH", "DETECTIVE MILLER", "BARTENDER"]
@@ -46,154 +515,2391 @@ class OpenAIClient:
             "tone_analysis": "The script has a dark, noir feel with elements of psychological thriller"
         }
 
-    def extract_dialogue(self, script_text):
-        """Mock function to extract dialogue from script"""
-        # In production, this would use a more sophisticated parser with OpenAI
-        
-        # For demo, we'll use a simple regex pattern to find character dialogue
-        dialogue_pattern = r'([A-Z][A-Z\s]+)(?:\(.*?\))?\n([\s\S]+?)(?=\n\n|\n[A-Z][A-Z\s]+|\Z)'
-        
-        dialogues = []
-        for match in re.finditer(dialogue_pattern, script_text):
-            character = match.group(1).strip()
-            lines = match.group(2).strip()
-            dialogues.append({
-                "character": character,
-                "text": lines,
-                "scene_id": 1,  # Would be determined by actual parsing
-                "emotion": "neutral"  # Would be determined by analysis
-            })
-            
-        return dialogues
+    def extract_dialogue(self, script_text):
+        """Extract dialogue lines from a screenplay
+
+        Scene ids follow the script's scene headings, and `sequence` records
+        each line's position in the script.
+        """
+        # In production, speaker emotions would be filled in by OpenAI
+        dialogues = []
+        scene_count = 0
+        scene_name = None
+        speech = None
+
+        def finish(speech):
+            if speech is not None and speech["parts"]:
+                dialogues.append({
+                    "character": speech["character"],
+                    "text": " ".join(speech["parts"]),
+                    "parenthetical": speech["parenthetical"],
+                    "scene_id": max(scene_count, 1),
+                    "scene_name": scene_name,
+                    "sequence": len(dialogues) + 1,
+                    "emotion": "neutral"
+                })
+
+        for kind, text in tokenize_screenplay(script_text):
+            if speech is not None and kind == "dialogue":
+                speech["parts"].append(text)
+                continue
+            if speech is not None and kind == "parenthetical":
+                if speech["parenthetical"] is None:
+                    speech["parenthetical"] = text
+                continue
+
+            finish(speech)
+            speech = None
+
+            if kind == "scene_heading":
+                scene_count += 1
+                scene_name = text
+            elif kind == "character":
+                speech = {"character": text, "parts": [], "parenthetical": None}
+
+        finish(speech)
+        return dialogues
+
+
+class HumeAIClient:
+    provider = "hume"
+    model_version = "mock-2"
+    sample_rate = 16000
+
+    def __init__(self, latency=0.5):
+        self.transport = get_provider_transport("hume")
+        # Simulated API response time, in seconds
+        self.latency = latency
+
+    def generate_speech(self, text, character, emotion="neutral", voice_id=None):
+        """Mock function for generating speech with HumeAI"""
+        # In production, this would call HumeAI API via self.transport.request
+        self.transport.call(time.sleep, self.latency)  # Simulate API call
+        
+        # For demo purposes, return WAV audio: a quiet tone per voice whose
+        # length follows the text, like the audio bytes a real TTS call returns
+        return pcm_to_wav(self._mock_pcm(max(0.5, 0.06 * len(text)), voice_id), self.sample_rate)
+
+    def stream_speech(self, text, character, emotion="neutral", voice_id=None):
+        """Yield a line's audio as raw 16-bit mono PCM, in chunks as it is synthesized
+
+        With HUME_STREAM_HTTP set, audio comes from the provider's streaming
+        endpoint (benchmarks/stub_provider.py serves a local stand-in);
+        otherwise the mock synthesizes one sentence at a time.
+        """
+        if HUME_STREAM_HTTP:
+            response = self.transport.request(
+                "POST", "/v0/tts/stream/file",
+                json={
+                    "utterances": [{"text": text, "description": emotion}],
+                    "voice": voice_id,
+                    "format": {"type": "pcm", "sample_rate": self.sample_rate}
+                },
+                stream=True
+            )
+            with response:
+                yield from response.iter_content(chunk_size=STREAM_READ_BYTES)
+            return
+
+        sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s] or [text]
+        for i, sentence in enumerate(sentences):
+            # Synthesis time follows sentence length, so the first sentence arrives early
+            delay = self.latency * len(sentence) / max(len(text), 1)
+            if i == 0:
+                self.transport.call(time.sleep, delay)
+            else:
+                time.sleep(delay)
+            yield self._mock_pcm(max(0.25, 0.06 * len(sentence)), voice_id)
+
+    def _mock_pcm(self, duration, voice_id):
+        """A quiet tone, pitched per voice, as 16-bit PCM"""
+        frequency = 110 + (int(hashlib.md5(str(voice_id).encode('utf-8')).hexdigest(), 16) % 8) * 30
+        t = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+        return (0.2 * np.sin(2 * np.pi * frequency * t) * 32767).astype('<i2').tobytes()
+    
+    def get_available_voices(self):
+        """Get available voice options"""
+        return [
+            {"id": "voice1", "name": "Male Deep", "gender": "male", "age": "adult"},
+            {"id": "voice2", "name": "Female Warm", "gender": "female", "age": "adult"},
+            {"id": "voice3", "name": "Male Raspy", "gender": "male", "age": "older"},
+            {"id": "voice4", "name": "Female Young", "gender": "female", "age": "young"},
+            {"id": "voice5", "name": "Neutral", "gender": "neutral", "age": "adult"}
+        ]
+
+
+def pcm_to_wav(pcm, sample_rate, channels=1, sample_width=2):
+    """Wrap raw PCM frames in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+@st.cache_resource(ttl=PROVIDER_CLIENT_TTL_SECONDS, show_spinner=False)
+def get_openai_client():
+    """OpenAI client shared by all sessions and reruns"""
+    return OpenAIClient()
+
+
+@st.cache_resource(ttl=PROVIDER_CLIENT_TTL_SECONDS, show_spinner=False)
+def get_hume_client():
+    """Hume AI client shared by all sessions and reruns"""
+    return HumeAIClient()
+
+
+@st.cache_data(ttl=VOICE_CATALOG_TTL_SECONDS, show_spinner=False)
+def get_voice_catalog():
+    """Voices offered by the speech provider"""
+    return get_hume_client().get_available_voices()
+
+
+# Initialize API clients
+openai_client = get_openai_client()
+hume_client = get_hume_client()
+
+
+class TimingHistogram:
+    """Durations of one span name, with payload size and cache outcome totals"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(TIMING_BUCKETS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def observe(self, seconds, size=None, cache_hit=None):
+        self.buckets[bisect.bisect_left(TIMING_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if size is not None:
+            self.total_bytes += size
+        if cache_hit is True:
+            self.hits += 1
+        elif cache_hit is False:
+            self.misses += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the `q` quantile, capped at the max"""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(TIMING_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "max_seconds": self.max_seconds,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "total_bytes": self.total_bytes,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "buckets": dict(zip([str(b) for b in TIMING_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+
+class TimingRegistry:
+    """Thread-safe collection of span histograms keyed by span name"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, size=None, cache_hit=None):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = TimingHistogram()
+            histogram.observe(seconds, size, cache_hit)
+
+    def snapshot(self):
+        """Histograms as plain dicts, sorted by span name"""
+        with self._lock:
+            return {name: self._histograms[name].to_dict() for name in sorted(self._histograms)}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def to_prometheus(self):
+        """Render the histograms in the Prometheus text exposition format"""
+        lines = [
+            "# HELP script_reader_span_seconds Duration of instrumented spans",
+            "# TYPE script_reader_span_seconds histogram",
+        ]
+        snapshot = self.snapshot()
+        for name, histogram in snapshot.items():
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(f'script_reader_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'script_reader_span_seconds_sum{{span="{name}"}} {histogram["total_seconds"]}')
+            lines.append(f'script_reader_span_seconds_count{{span="{name}"}} {histogram["count"]}')
+
+        lines += [
+            "# HELP script_reader_span_bytes_total Payload bytes handled by instrumented spans",
+            "# TYPE script_reader_span_bytes_total counter",
+        ]
+        for name, histogram in snapshot.items():
+            lines.append(f'script_reader_span_bytes_total{{span="{name}"}} {histogram["total_bytes"]}')
+
+        lines += [
+            "# HELP script_reader_span_cache_total Cache lookups made by instrumented spans",
+            "# TYPE script_reader_span_cache_total counter",
+        ]
+        for name, histogram in snapshot.items():
+            lines.append(f'script_reader_span_cache_total{{span="{name}",result="hit"}} {histogram["cache_hits"]}')
+            lines.append(f'script_reader_span_cache_total{{span="{name}",result="miss"}} {histogram["cache_misses"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+@st.cache_resource(show_spinner=False)
+def get_timing_registry():
+    """Process-wide timings, shared by all sessions and reruns"""
+    return TimingRegistry(enabled=TIMINGS_ENABLED)
+
+
+timing_registry = get_timing_registry()
+
+
+class TimingSpan:
+    """Details a timed block can attach before it finishes"""
+    __slots__ = ("size", "cache_hit")
+
+    def __init__(self):
+        self.size = None
+        self.cache_hit = None
+
+
+class _NullSpan:
+    """Yielded while timings are off; attribute writes are discarded"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+@contextmanager
+def timed(name):
+    """Record how long the block takes under span `name`
+
+    The yielded span accepts `size` (payload bytes) and `cache_hit`. Timings
+    go to the process-wide registry and, on the script thread, to the
+    session's own registry.
+    """
+    if not timing_registry.enabled:
+        yield _NULL_SPAN
+        return
+
+    span = TimingSpan()
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        record_timing(name, time.perf_counter() - start, span.size, span.cache_hit)
+
+
+def record_timing(name, seconds, size=None, cache_hit=None):
+    """Record a duration measured outside a `timed` block under span `name`"""
+    if not timing_registry.enabled:
+        return
+
+    timing_registry.observe(name, seconds, size, cache_hit)
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        session_timings = st.session_state.get("timings")
+        if session_timings is not None:
+            session_timings.observe(name, seconds, size, cache_hit)
+
+
+@contextmanager
+def connect_db(path):
+    """Open a SQLite connection that commits on success and always closes"""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class AudioCache:
+    """Persistent, size-bounded LRU cache of synthesized speech
+
+    Entries are keyed by a content hash of the speech request (see
+    `tts_cache_key`), so identical lines share a clip no matter where they
+    appear in the script. When the stored payloads exceed `max_bytes`, the
+    least recently used entries are evicted.
+
+    Sizes sit after the payload in each row, so summing them would read
+    the whole database. A running entry count and byte total are kept in
+    the `totals` table instead, updated in the same transaction as the
+    clips, and eviction walks an index that covers key and size.
+    """
+
+    def __init__(self, path, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect_db(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS clips ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("DROP INDEX IF EXISTS clips_last_access")
+            conn.execute("CREATE INDEX IF NOT EXISTS clips_lru ON clips (last_access, key, size)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS totals ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+            )
+            if conn.execute("SELECT 1 FROM totals").fetchone() is None:
+                # Caches from before the running totals are summed once
+                conn.execute(
+                    "INSERT INTO totals (id, entries, bytes) "
+                    "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM clips INDEXED BY clips_lru"
+                )
+
+    def get(self, key):
+        """Return the cached payload for `key`, or None on a miss"""
+        with connect_db(self.path) as conn:
+            row = conn.execute("SELECT payload FROM clips WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE clips SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return row[0] if row is not None else None
+
+    def peek(self, key):
+        """Return the cached payload for `key`, or None, without counting a hit or miss
+
+        For reading back clips that were just stored, which would otherwise
+        show up as hits in the cache statistics.
+        """
+        with connect_db(self.path) as conn:
+            row = conn.execute("SELECT payload FROM clips WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, key, payload):
+        """Store a payload (audio bytes or a URL) and evict old entries if needed"""
+        size = len(payload.encode('utf-8') if isinstance(payload, str) else payload)
+
+        with connect_db(self.path) as conn:
+            # Take the write lock first, so the replaced size and the totals agree
+            conn.execute("BEGIN IMMEDIATE")
+            replaced = conn.execute("SELECT size FROM clips WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO clips (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time())
+            )
+            entries, total = conn.execute(
+                "UPDATE totals SET entries = entries + ?, bytes = bytes + ? RETURNING entries, bytes",
+                (0 if replaced else 1, size - (replaced[0] if replaced else 0))
+            ).fetchone()
+
+            if total > self.max_bytes:
+                expired = []
+                for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM clips INDEXED BY clips_lru ORDER BY last_access"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    expired.append((old_key,))
+                    total -= old_size
+                conn.executemany("DELETE FROM clips WHERE key = ?", expired)
+                conn.execute("UPDATE totals SET entries = ?, bytes = ?", (entries - len(expired), total))
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the cache"""
+        with connect_db(self.path) as conn:
+            entries, size = conn.execute("SELECT entries, bytes FROM totals").fetchone()
+
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+@st.cache_resource
+def get_audio_cache():
+    """Audio cache shared by all sessions and reruns"""
+    return AudioCache(os.path.join(DATA_DIR, "tts_cache.sqlite"))
+
+
+@st.cache_resource
+def get_variant_cache():
+    """Cache of clips rendered with playback effects, shared by all sessions"""
+    return AudioCache(os.path.join(DATA_DIR, "variant_cache.sqlite"), max_bytes=VARIANT_CACHE_MAX_BYTES)
+
+
+class AnalysisCache:
+    """Persistent store of script analysis results keyed by content hash
+
+    Lives on disk so results survive restarts and are shared by every
+    session. Keys include the analyzer version, so upgrading the analyzer
+    naturally bypasses stale entries.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect_db(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "key TEXT PRIMARY KEY, analysis TEXT NOT NULL, "
+                "dialogues TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def key_for(script_content):
+        """Hash of the script content plus the analyzer version"""
+        digest = hashlib.sha256()
+        digest.update(OpenAIClient.analyzer_version.encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(script_content.encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def revision_key_for(previous_content, script_content):
+        """Key for a draft analyzed incrementally from `previous_content`
+
+        What carries over depends on the previous draft, so these results
+        must never be served for the plain content key.
+        """
+        digest = hashlib.sha256()
+        digest.update(OpenAIClient.analyzer_version.encode('utf-8'))
+        digest.update(b"\0revision\0")
+        digest.update(hashlib.sha256(previous_content.encode('utf-8')).digest())
+        digest.update(script_content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return (analysis, dialogues) for `key`, or None if not cached"""
+        with connect_db(self.path) as conn:
+            row = conn.execute("SELECT analysis, dialogues FROM analyses WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def put(self, key, analysis, dialogues):
+        with connect_db(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, analysis, dialogues, created) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(analysis), json.dumps(dialogues), time.time())
+            )
+
+
+@st.cache_resource
+def get_analysis_cache():
+    """Analysis cache shared by all sessions and reruns"""
+    return AnalysisCache(os.path.join(DATA_DIR, "analysis_cache.sqlite"))
+
+
+def split_script_by_scene(script_text, max_chars=ANALYSIS_CHUNK_CHARS):
+    """Pack a script's scenes into chunks of at most `max_chars` characters
+
+    Returns (scene_offset, chunk_text) pairs, where scene_offset is the number
+    of scene headings before the chunk. Whole scenes are packed greedily and
+    a chunk is closed before the scene that would take it over `max_chars`,
+    so only a single scene longer than `max_chars` exceeds it, as a chunk of
+    its own.
+    """
+    chunks = []
+    chunk_scenes = []
+    chunk_size = 0
+    chunk_offset = 0
+
+    for index, scene in enumerate(split_scenes(script_text)):
+        # Scenes are joined with a newline
+        size = len(scene) + (1 if chunk_scenes else 0)
+        if chunk_scenes and chunk_size + size > max_chars:
+            chunks.append((chunk_offset, "\n".join(chunk_scenes)))
+            chunk_scenes = []
+            chunk_offset = index
+            size = len(scene)
+            chunk_size = 0
+
+        chunk_scenes.append(scene)
+        chunk_size += size
+
+    if chunk_scenes:
+        chunks.append((chunk_offset, "\n".join(chunk_scenes)))
+
+    return chunks
+
+
+def split_scenes(script_text):
+    """Split a script into scene texts, each starting at its scene heading
+
+    Text before the first heading stays with the first scene, so scene `i`
+    always has `i` headings before it.
+    """
+    scenes = []
+    lines = []
+    has_heading = False
+
+    for line in script_text.splitlines():
+        if SCENE_HEADING_PATTERN.match(line.strip()):
+            if has_heading:
+                scenes.append("\n".join(lines))
+                lines = []
+            has_heading = True
+        lines.append(line)
+
+    if lines:
+        scenes.append("\n".join(lines))
+
+    return scenes
+
+
+def scene_digest(scene_text):
+    """Hash of a scene's text, ignoring indentation and blank lines"""
+    normalized = "\n".join(line.strip() for line in scene_text.splitlines() if line.strip())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def normalize_character_name(name):
+    """Canonical form of a character name, without extensions like (V.O.)"""
+    return " ".join(re.sub(r'\(.*?\)', ' ', name).split()).upper()
+
+
+def merge_script_analyses(chunk_results):
+    """Combine per-chunk analyses into a single whole-script analysis
+
+    `chunk_results` holds (scene_offset, analysis) pairs in script order.
+    Characters are deduplicated by normalized name and scene ids are shifted
+    by each chunk's scene offset.
+    """
+    characters = []
+    character_details = {}
+    scenes = []
+    scene_ids = set()
+    relationships = []
+    relationship_keys = set()
+    tones = []
+
+    for scene_offset, analysis in chunk_results:
+        for character in analysis.get("characters", []):
+            name = normalize_character_name(character)
+            if name not in character_details:
+                characters.append(name)
+                character_details[name] = {}
+
+        for character, details in analysis.get("character_details", {}).items():
+            merged = character_details.setdefault(normalize_character_name(character), {})
+            for field, value in details.items():
+                merged.setdefault(field, value)
+
+        for scene in analysis.get("scenes", []):
+            scene_id = scene_offset + scene["id"]
+            if scene_id in scene_ids:
+                continue
+            scene_ids.add(scene_id)
+            scenes.append(dict(
+                scene,
+                id=scene_id,
+                characters=[normalize_character_name(c) for c in scene.get("characters", [])]
+            ))
+
+        for relationship in analysis.get("relationships", []):
+            pair = [normalize_character_name(c) for c in relationship.get("characters", [])]
+            key = (frozenset(pair), relationship.get("relationship"))
+            if key not in relationship_keys:
+                relationship_keys.add(key)
+                relationships.append(dict(relationship, characters=pair))
+
+        tone = analysis.get("tone_analysis")
+        if tone and tone not in tones:
+            tones.append(tone)
+
+    return {
+        "characters": characters,
+        "scenes": sorted(scenes, key=lambda scene: scene["id"]),
+        "character_details": character_details,
+        "relationships": relationships,
+        "tone_analysis": " ".join(tones)
+    }
+
+
+def analyze_script_chunked(script_content, max_workers=MAX_ANALYSIS_CONCURRENCY):
+    """Analyze a script scene chunk by scene chunk and merge the results
+
+    Short scripts are sent in a single call. Longer ones are split at scene
+    headings and the chunks are analyzed concurrently, at most
+    `max_workers` at a time.
+    """
+    chunks = split_script_by_scene(script_content)
+    if len(chunks) == 1:
+        return request_analysis(script_content)
+
+    return merge_script_analyses(analyze_chunks(chunks, max_workers))
+
+
+def request_analysis(text):
+    """Analyze `text` with OpenAI, joining an identical analysis already in flight"""
+    return get_single_flight("analysis").do(AnalysisCache.key_for(text), openai_client.analyze_script, text)
+
+
+def analyze_chunks(chunks, max_workers=MAX_ANALYSIS_CONCURRENCY):
+    """Analyze (scene_offset, text) chunks concurrently
+
+    Returns (scene_offset, analysis) pairs in the order of `chunks`.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        analyses = executor.map(request_analysis, [text for _, text in chunks])
+        return list(zip([offset for offset, _ in chunks], analyses))
+
+
+def analyze_script_revision(script_content, previous_content, previous_analysis, speakers):
+    """Analyze a new draft, re-analyzing only the scenes that changed
+
+    Scenes are matched between drafts by content. Unchanged scenes keep
+    their previous analysis, wherever they moved to, and each run of changed
+    or new scenes is analyzed in chunks. Characters, details and
+    relationships carry over while their characters are still present;
+    `speakers` holds the normalized names of the new draft's speakers.
+
+    Returns None when fewer than REVISION_MIN_SIMILARITY of the scenes are
+    shared, as the new script is then not a revision of the previous one.
+    """
+    old_scenes = split_scenes(previous_content)
+    new_scenes = split_scenes(script_content)
+    matcher = difflib.SequenceMatcher(
+        None,
+        [scene_digest(scene) for scene in old_scenes],
+        [scene_digest(scene) for scene in new_scenes],
+        autojunk=False
+    )
+    if matcher.ratio() < REVISION_MIN_SIMILARITY:
+        return None
+
+    previous_scenes = {scene["id"]: scene for scene in previous_analysis.get("scenes", [])}
+
+    kept = []
+    chunks = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            # Scene ids are 1-based and relative to the pair's scene offset
+            scenes = [
+                dict(previous_scenes[i1 + k + 1], id=k + 1)
+                for k in range(i2 - i1) if i1 + k + 1 in previous_scenes
+            ]
+            kept.append((j1, {"scenes": scenes}))
+        elif j2 > j1:
+            run = "\n".join(new_scenes[j1:j2])
+            chunks += [(j1 + offset, text) for offset, text in split_script_by_scene(run)]
+
+    present = set(speakers)
+    for _, analysis in kept:
+        for scene in analysis["scenes"]:
+            present.update(scene.get("characters", []))
+
+    carried = {
+        "characters": [c for c in previous_analysis.get("characters", []) if c in present],
+        "character_details": {
+            c: details for c, details in previous_analysis.get("character_details", {}).items() if c in present
+        },
+        "relationships": [
+            relationship for relationship in previous_analysis.get("relationships", [])
+            if all(c in present for c in relationship.get("characters", []))
+        ],
+        # Re-analyzed scenes replace the tone rather than add to it each draft
+        "tone_analysis": previous_analysis.get("tone_analysis") if kept and not chunks else None,
+    }
+
+    return merge_script_analyses([(0, carried)] + kept + (analyze_chunks(chunks) if chunks else []))
+
+
+class ProjectStore:
+    """SQLite-backed repository of saved projects
+
+    Project metadata lives in its own table, so listing projects never reads
+    dialogues or audio. Dialogues and clips are stored one row per line with
+    a content digest, and saves only write rows whose digest changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect_db(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS projects ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, "
+                "date TEXT NOT NULL, script_name TEXT NOT NULL, "
+                "character_count INTEGER NOT NULL, dialogue_count INTEGER NOT NULL, "
+                "clip_count INTEGER NOT NULL, analysis TEXT, character_voices TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dialogues ("
+                "project_id INTEGER NOT NULL, line_id TEXT NOT NULL, digest TEXT NOT NULL, "
+                "position INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (project_id, line_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS clips ("
+                "project_id INTEGER NOT NULL, line_id TEXT NOT NULL, digest TEXT NOT NULL, "
+                "data TEXT NOT NULL, audio BLOB, PRIMARY KEY (project_id, line_id))"
+            )
+
+    def list_projects(self):
+        """Return metadata for every saved project, newest first"""
+        with connect_db(self.path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT id, name, date, script_name, character_count, dialogue_count, clip_count "
+                "FROM projects ORDER BY date DESC, id DESC"
+            ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def load_project(self, project_id):
+        """Load a project's analysis, dialogues, clips and voices
+
+        Clip audio is left in the store. Each clip's `audio_ref` names the
+        row holding it instead, and `clip_audio` reads it when it is played.
+        """
+        with connect_db(self.path) as conn:
+            row = conn.execute(
+                "SELECT name, script_name, analysis, character_voices FROM projects WHERE id = ?",
+                (project_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            dialogues = [
+                json.loads(data) for (data,) in conn.execute(
+                    "SELECT data FROM dialogues WHERE project_id = ? ORDER BY position", (project_id,)
+                )
+            ]
+
+            audio_clips = {}
+            for line_id, data in conn.execute(
+                "SELECT line_id, data FROM clips WHERE project_id = ?", (project_id,)
+            ):
+                clip = json.loads(data)
+                clip["audio_ref"] = [project_id, line_id]
+                audio_clips[line_id] = clip
+
+        return {
+            "name": row[0],
+            "script_name": row[1],
+            "analysis": json.loads(row[2]) if row[2] else None,
+            "dialogues": dialogues,
+            "audio_clips": audio_clips,
+            "character_voices": json.loads(row[3])
+        }
+
+    def save_project(self, name, script_name, analysis, dialogues, audio_clips, character_voices):
+        """Create or update the project called `name`
+
+        Returns the number of dialogue and clip rows written, which is zero
+        when re-saving an unchanged project.
+        """
+        metadata = (
+            datetime.now().strftime("%Y-%m-%d %H:%M"),
+            script_name,
+            len((analysis or {}).get("characters", [])),
+            len(dialogues),
+            len(audio_clips),
+            json.dumps(analysis),
+            json.dumps(character_voices)
+        )
+
+        dialogue_rows = {}
+        for position, dialogue in enumerate(dialogues):
+            data = json.dumps(dialogue, sort_keys=True)
+            digest = hashlib.sha1(f"{position}\n{data}".encode('utf-8')).hexdigest()
+            dialogue_rows[dialogue["line_id"]] = (digest, position, data)
+
+        clip_rows = {line_id: self._clip_row(clip) for line_id, clip in audio_clips.items()}
+        # Audio left in the store is copied only for rows that are written
+        for line_id, clip in audio_clips.items():
+            if "url" not in clip and clip.get("audio_ref"):
+                digest, data, _ = clip_rows[line_id]
+                clip_rows[line_id] = (digest, data, functools.partial(self.load_clip_audio, *clip["audio_ref"]))
+
+        with connect_db(self.path) as conn:
+            row = conn.execute("SELECT id FROM projects WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                project_id = conn.execute(
+                    "INSERT INTO projects (name, date, script_name, character_count, dialogue_count, "
+                    "clip_count, analysis, character_voices) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (name,) + metadata
+                ).lastrowid
+            else:
+                project_id = row[0]
+                conn.execute(
+                    "UPDATE projects SET date = ?, script_name = ?, character_count = ?, dialogue_count = ?, "
+                    "clip_count = ?, analysis = ?, character_voices = ? WHERE id = ?",
+                    metadata + (project_id,)
+                )
+
+            written = self._sync_rows(conn, "dialogues", ("position", "data"), project_id, dialogue_rows)
+            written += self._sync_rows(conn, "clips", ("data", "audio"), project_id, clip_rows)
+
+        return written
+
+    def load_clip_audio(self, project_id, line_id, conn=None):
+        """Return the audio stored for one clip, or None if it's gone"""
+        if conn is None:
+            with connect_db(self.path) as conn:
+                return self.load_clip_audio(project_id, line_id, conn)
+
+        row = conn.execute(
+            "SELECT audio FROM clips WHERE project_id = ? AND line_id = ?", (project_id, line_id)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_project(self, name):
+        """Return the id of the project called `name`, or None"""
+        with connect_db(self.path) as conn:
+            row = conn.execute("SELECT id FROM projects WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def add_clips(self, project_id, clips):
+        """Stream (line_id, clip) pairs into a project
+
+        Rows are written as the iterable is consumed, so importing hours of
+        audio only ever holds one clip in memory.
+        """
+        rows = ((project_id, line_id) + self._clip_row(clip) for line_id, clip in clips)
+
+        with connect_db(self.path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO clips (project_id, line_id, digest, data, audio) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "UPDATE projects SET clip_count = (SELECT COUNT(*) FROM clips WHERE project_id = ?) WHERE id = ?",
+                (project_id, project_id)
+            )
+
+    def delete_project(self, project_id):
+        with connect_db(self.path) as conn:
+            for table in ("dialogues", "clips"):
+                conn.execute(f"DELETE FROM {table} WHERE project_id = ?", (project_id,))
+            conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    @staticmethod
+    def _clip_row(clip):
+        """(digest, data, audio) column values for a clip"""
+        data = json.dumps({k: v for k, v in clip.items() if k not in ("url", "audio_ref")}, sort_keys=True)
+        # The cache key identifies the audio, so the digest needn't hash it
+        digest = hashlib.sha1(f"{clip.get('cache_key')}\n{data}".encode('utf-8')).hexdigest()
+        return digest, data, clip.get("url")
+
+    @staticmethod
+    def _sync_rows(conn, table, columns, project_id, rows):
+        """Upsert rows whose digest changed and delete rows that are gone
+
+        `rows` maps line_id to (digest, *column_values). A callable value is
+        called with `conn=conn` when its row is written, so values that are
+        expensive to load are only loaded for changed rows, one at a time.
+        """
+        stored = dict(conn.execute(f"SELECT line_id, digest FROM {table} WHERE project_id = ?", (project_id,)))
+
+        changed = [line_id for line_id, values in rows.items() if stored.get(line_id) != values[0]]
+        placeholders = ", ".join("?" * (3 + len(columns)))
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} (project_id, line_id, digest, {', '.join(columns)}) "
+            f"VALUES ({placeholders})",
+            (
+                (project_id, line_id) + tuple(value(conn=conn) if callable(value) else value for value in rows[line_id])
+                for line_id in changed
+            )
+        )
+
+        removed = [(project_id, line_id) for line_id in stored.keys() - rows.keys()]
+        conn.executemany(f"DELETE FROM {table} WHERE project_id = ? AND line_id = ?", removed)
+
+        return len(changed) + len(removed)
+
+
+@st.cache_resource
+def get_project_store():
+    """Project repository shared by all sessions and reruns"""
+    return ProjectStore(os.path.join(DATA_DIR, "projects.sqlite"))
+
+
+def normalize_tts_text(text):
+    """Collapse whitespace so formatting differences don't defeat the cache"""
+    return " ".join(text.split())
+
+
+def tts_cache_key(text, voice_id, emotion):
+    """Content hash identifying a unique speech request"""
+    request = [
+        normalize_tts_text(text),
+        voice_id,
+        emotion,
+        HumeAIClient.provider,
+        HumeAIClient.model_version
+    ]
+    return hashlib.sha256(json.dumps(request).encode('utf-8')).hexdigest()
+
+
+def assign_line_ids(dialogues):
+    """Give each dialogue line a stable id derived from its speaker and text
+
+    Ids don't depend on a line's position, so inserting or reordering lines
+    leaves existing clips attached to the right dialogue. Repeated lines get
+    an occurrence suffix.
+    """
+    seen = {}
+    for dialogue in dialogues:
+        content = f"{dialogue['character']}\n{normalize_tts_text(dialogue['text'])}"
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        dialogue["line_id"] = digest if occurrence == 0 else f"{digest}-{occurrence}"
+
+    return dialogues
+
+
+class DialogueTable:
+    """Columnar table of a script's dialogue lines and their clip status
+
+    Indexed by line_id. Low-cardinality columns are categorical and text is
+    held as Arrow strings, which keeps long scripts compact and lets pages
+    filter and count with vectorized operations instead of rescanning dicts.
+    Iterating yields plain dialogue dicts.
+    """
+
+    COLUMNS = {
+        "character": "category",
+        "text": "string[pyarrow]",
+        "parenthetical": "string[pyarrow]",
+        "scene_id": "int32",
+        "scene_name": "category",
+        "sequence": "int32",
+        "emotion": "category",
+        "has_clip": "bool"
+    }
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @classmethod
+    def from_records(cls, dialogues, audio_clips=None):
+        frame = pd.DataFrame.from_records(list(dialogues), columns=["line_id", *cls.COLUMNS])
+        frame["scene_id"] = frame["scene_id"].fillna(1)
+        frame["sequence"] = frame["sequence"].fillna(pd.Series(range(1, len(frame) + 1)))
+        frame["emotion"] = frame["emotion"].fillna("neutral")
+        frame["has_clip"] = frame["line_id"].isin(list(audio_clips or {}))
+        return cls(frame.astype(cls.COLUMNS).set_index("line_id"))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def records(self, frame=None):
+        """Convert rows (all rows by default) back into dialogue dicts"""
+        frame = (self.frame if frame is None else frame).drop(columns="has_clip").reset_index()
+        frame = frame.astype(object)
+        return frame.where(frame.notna(), None).to_dict("records")
+
+    def get(self, line_id):
+        return self.records(self.frame.loc[[line_id]])[0]
+
+    def set_emotion(self, line_id, emotion):
+        if emotion not in self.frame["emotion"].cat.categories:
+            self.frame["emotion"] = self.frame["emotion"].cat.add_categories([emotion])
+        self.frame.at[line_id, "emotion"] = emotion
+
+    def set_clip_status(self, line_ids, has_clip):
+        self.frame.loc[list(line_ids), "has_clip"] = has_clip
+
+    def filter(self, scene_id=None, character=None):
+        """Rows for a scene and/or character, in script order"""
+        mask = pd.Series(True, index=self.frame.index)
+        if scene_id is not None:
+            mask &= self.frame["scene_id"] == scene_id
+        if character is not None:
+            mask &= self.frame["character"] == character
+        return self.frame[mask].sort_values("sequence")
+
+    def following(self, line_id, count):
+        """Rows for the `count` lines after `line_id`, in script order"""
+        ordered = self.frame.sort_values("sequence")
+        position = ordered.index.get_loc(line_id)
+        return ordered.iloc[position + 1:position + 1 + count]
+
+    def character_counts(self):
+        """Dialogue line and clip counts per character"""
+        return self.frame.groupby("character", observed=True).agg(
+            lines=("sequence", "size"), clips=("has_clip", "sum")
+        )
+
+    def scene_counts(self):
+        """Dialogue line and clip counts per scene id"""
+        return self.frame.groupby("scene_id").agg(
+            lines=("sequence", "size"), clips=("has_clip", "sum")
+        )
+
+
+class SceneClipIndex:
+    """Generated clips grouped by scene, each scene kept in script order
+
+    Maintained incrementally as clips are added or removed, so looking up a
+    scene's playlist is a dictionary access rather than a scan of every clip.
+    """
+
+    def __init__(self):
+        self._scenes = {}
+        self._all = []
+        self._entries = {}
+
+    @classmethod
+    def from_clips(cls, audio_clips):
+        index = cls()
+        for line_id, clip in audio_clips.items():
+            index.add(line_id, clip)
+        return index
+
+    def add(self, line_id, clip):
+        """Insert or reposition a clip"""
+        self.remove(line_id)
+        entry = (clip.get("sequence") or 0, line_id)
+        scene_id = clip.get("scene_id", 1)
+
+        bisect.insort(self._scenes.setdefault(scene_id, []), entry)
+        bisect.insort(self._all, entry)
+        self._entries[line_id] = (scene_id, entry)
+
+    def remove(self, line_id):
+        if line_id not in self._entries:
+            return
+
+        scene_id, entry = self._entries.pop(line_id)
+        for entries in (self._scenes[scene_id], self._all):
+            del entries[bisect.bisect_left(entries, entry)]
+        if not self._scenes[scene_id]:
+            del self._scenes[scene_id]
+
+    def scene_ids(self):
+        return sorted(self._scenes)
+
+    def line_ids(self, scene_id=None):
+        """Line ids with clips in script order, for one scene or all of them"""
+        entries = self._all if scene_id is None else self._scenes.get(scene_id, [])
+        return [line_id for _, line_id in entries]
+
+
+def search_tokens(text):
+    """Lower-cased words of `text`, as the search index stores them"""
+    return SEARCH_TOKEN_PATTERN.findall(str(text or "").lower().replace("\u2019", "'"))
+
+
+class DialogueSearchIndex:
+    """Inverted index over dialogue text, characters, emotions and scene names
+
+    Each word maps to the lines containing it and its positions there, and
+    the vocabulary is kept sorted so prefix queries are a bisect. Lines are
+    re-indexed one at a time, so an edit doesn't rebuild the index.
+
+    Queries match lines containing every term. A term ending in * matches
+    words starting with it, and words in double quotes must appear in that
+    order within one field.
+    """
+
+    FIELDS = ("character", "text", "scene_name", "emotion")
+    # Spacing between fields' positions, so a phrase never spans two fields
+    FIELD_POSITION_GAP = 1 << 20
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._line_terms = {}
+        self._sequence = {}
+
+    @classmethod
+    def from_dialogues(cls, dialogues):
+        index = cls()
+        for dialogue in dialogues:
+            index.add(dialogue["line_id"], dialogue)
+        return index
+
+    def __len__(self):
+        return len(self._line_terms)
+
+    def add(self, line_id, dialogue):
+        """Index a line, replacing whatever was indexed for it before"""
+        self.remove(line_id)
+
+        terms = {}
+        for field_number, field in enumerate(self.FIELDS):
+            base = field_number * self.FIELD_POSITION_GAP
+            for position, term in enumerate(search_tokens(dialogue.get(field)), start=base):
+                terms.setdefault(term, []).append(position)
+
+        for term, positions in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[line_id] = positions
+
+        self._line_terms[line_id] = list(terms)
+        self._sequence[line_id] = dialogue.get("sequence") or 0
+
+    def remove(self, line_id):
+        for term in self._line_terms.pop(line_id, []):
+            postings = self._postings[term]
+            del postings[line_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        self._sequence.pop(line_id, None)
+
+    def search(self, query):
+        """Line ids matching `query`, in script order"""
+        matches = None
+        for phrase, word in SEARCH_QUERY_PATTERN.findall(query):
+            if word.endswith("*") and len(search_tokens(word)) == 1:
+                lines = self._prefix_lines(search_tokens(word)[0])
+            else:
+                lines = self._phrase_lines(search_tokens(phrase or word))
+            if lines is None:
+                continue
+
+            matches = lines if matches is None else matches & lines
+            if not matches:
+                break
+
+        return sorted(matches or (), key=self._sequence.__getitem__)
+
+    def _prefix_lines(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        lines = set()
+        for term in itertools.islice(self._vocabulary, start, None):
+            if not term.startswith(prefix):
+                break
+            lines.update(self._postings[term])
+        return lines
+
+    def _phrase_lines(self, terms):
+        """Lines containing `terms` consecutively; None for a clause with no words"""
+        if not terms:
+            return None
+
+        postings = [self._postings.get(term, {}) for term in terms]
+        lines = set(min(postings, key=len)).intersection(*postings)
+        if len(terms) == 1:
+            return lines
+
+        phrase_lines = set()
+        for line_id in lines:
+            following = [set(p[line_id]) for p in postings[1:]]
+            if any(
+                all(start + offset in positions for offset, positions in enumerate(following, start=1))
+                for start in postings[0][line_id]
+            ):
+                phrase_lines.add(line_id)
+        return phrase_lines
+
+
+# Set page configuration
+st.set_page_config(
+    page_title="AI Script Reader Platform",
+    page_icon="🎬",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Session state initialization
+if 'current_script' not in st.session_state:
+    st.session_state.current_script = None
+if 'script_analysis' not in st.session_state:
+    st.session_state.script_analysis = None
+if 'script_content' not in st.session_state:
+    st.session_state.script_content = None
+if 'dialogues' not in st.session_state:
+    st.session_state.dialogues = DialogueTable.from_records([])
+if 'audio_clips' not in st.session_state:
+    st.session_state.audio_clips = {}
+if 'scene_index' not in st.session_state:
+    st.session_state.scene_index = SceneClipIndex()
+if 'search_index' not in st.session_state:
+    st.session_state.search_index = DialogueSearchIndex()
+if 'audio_jobs' not in st.session_state:
+    st.session_state.audio_jobs = []
+    st.session_state.audio_job_cursors = {}
+if 'audio_job_evicted' not in st.session_state:
+    # Per job, clips that dropped out of the TTS cache before they were collected
+    st.session_state.audio_job_evicted = {}
+if 'character_voices' not in st.session_state:
+    st.session_state.character_voices = {}
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'timings' not in st.session_state:
+    st.session_state.timings = TimingRegistry(enabled=True)
+
+
+def extract_text_from_docx(file):
+    """Extract text content from a .docx file
+
+    Paragraphs, including those in table cells, are streamed from the
+    document XML (see `iter_docx_paragraphs`).
+    """
+    # Imported on first upload so reruns without one skip the parser
+    from extractors import iter_docx_paragraphs
+
+    data = file.getvalue() if hasattr(file, 'getvalue') else file.read()
+
+    with timed("extract_text_from_docx") as span:
+        span.size = len(data)
+        return '\n'.join(iter_docx_paragraphs(data))
+
+
+def extract_text_from_pdf(file, progress_callback=None):
+    """Extract text content from a .pdf file
+
+    Pages are extracted in parallel (see `iter_pdf_pages`).
+    `progress_callback(pages_done, total_pages)` is called as each page
+    becomes available.
+    """
+    from extractors import iter_pdf_pages
+
+    data = file.getvalue() if hasattr(file, 'getvalue') else file.read()
+
+    with timed("extract_text_from_pdf") as span:
+        span.size = len(data)
+        pages = []
+        for page_index, total_pages, page_text in iter_pdf_pages(data):
+            pages.append(page_text)
+            if progress_callback:
+                progress_callback(page_index + 1, total_pages)
+
+        return '\n'.join(pages)
+
+
+def process_uploaded_script(uploaded_file):
+    """Process an uploaded script file"""
+    if uploaded_file is None:
+        return None
+
+    with timed("process_uploaded_script") as span:
+        span.size = uploaded_file.size
+        return _extract_script_text(uploaded_file)
+
+
+def _extract_script_text(uploaded_file):
+    """Text of an uploaded script, dispatched on its file extension"""
+    file_extension = uploaded_file.name.split('.')[-1].lower()
+    
+    if file_extension == 'txt':
+        script_content = uploaded_file.getvalue().decode('utf-8')
+    elif file_extension == 'docx':
+        script_content = extract_text_from_docx(uploaded_file)
+    elif file_extension == 'pdf':
+        progress_bar = st.progress(0.0, text="Extracting PDF pages...")
+        script_content = extract_text_from_pdf(
+            uploaded_file,
+            progress_callback=lambda done, total: progress_bar.progress(
+                done / total, text=f"Extracted page {done} of {total}"
+            )
+        )
+        progress_bar.empty()
+    else:
+        st.error(f"Unsupported file format: {file_extension}")
+        return None
+    
+    return script_content
+
+
+def analyze_script(script_content, previous_content=None, previous_analysis=None):
+    """Analyze script content using OpenAI
+
+    Results are memoized by content hash, so re-processing an identical
+    script returns the stored analysis without calling OpenAI. Given the
+    previous draft and its analysis, only the scenes that changed are sent
+    for analysis (see `analyze_script_revision`). Those results are cached
+    under the pair of drafts, as they depend on the previous one.
+    """
+    with timed("analyze_script") as span:
+        span.size = len(script_content)
+        analysis_cache = get_analysis_cache()
+        key = AnalysisCache.key_for(script_content)
+        revision_key = None
+        if previous_content and previous_analysis:
+            revision_key = AnalysisCache.revision_key_for(previous_content, script_content)
+
+        cached = analysis_cache.get(key)
+        if cached is None and revision_key is not None:
+            cached = analysis_cache.get(revision_key)
+        span.cache_hit = cached is not None
+        if cached is not None:
+            return cached
+
+        with st.spinner('Analyzing script...'):
+            dialogues = assign_line_ids(openai_client.extract_dialogue(script_content))
+            analysis = None
+            if revision_key is not None:
+                speakers = {normalize_character_name(d["character"]) for d in dialogues}
+                analysis = analyze_script_revision(script_content, previous_content, previous_analysis, speakers)
+
+            if analysis is None:
+                analysis = analyze_script_chunked(script_content)
+                analysis_cache.put(key, analysis, dialogues)
+            else:
+                analysis_cache.put(revision_key, analysis, dialogues)
+
+            return analysis, dialogues
+
+
+def synthesize_speech(text, character, emotion, voice_id):
+    """Return audio for a line, calling HumeAI only on a cache miss
+
+    Safe to call from worker threads; it doesn't touch session state.
+    """
+    with timed("synthesize_speech") as span:
+        audio_cache = get_audio_cache()
+        key = tts_cache_key(text, voice_id, emotion)
+
+        audio_url = audio_cache.get(key)
+        span.cache_hit = audio_url is not None
+        if audio_url is None:
+            def generate():
+                audio = hume_client.generate_speech(text, character, emotion, voice_id=voice_id)
+                audio_cache.put(key, audio)
+                return audio
+
+            # Another session may be generating this exact clip right now
+            audio_url = get_single_flight("speech").do(key, generate)
+
+        span.size = len(audio_url)
+        return audio_url
+
+
+def stream_speech(text, character, emotion, voice_id, on_audio=None):
+    """Like `synthesize_speech`, but hands audio to `on_audio` while it arrives
+
+    Streamed PCM is buffered in memory and passed to `on_audio(wav_bytes)`
+    in segments of at least STREAM_SEGMENT_SECONDS. The finished clip then goes into the TTS cache;
+    a cached clip is passed on whole. Misses go through the "speech"
+    single-flight group like `synthesize_speech`, so a request joining an
+    identical one in flight gets the clip whole once it is done. Returns
+    (audio, seconds until the first audio was handed over).
+    """
+    start = time.perf_counter()
+    first_audio = None
+
+    def emit(wav):
+        nonlocal first_audio
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+            record_timing("time_to_first_audio", first_audio)
+        if on_audio:
+            on_audio(wav)
+
+    with timed("stream_speech") as span:
+        audio_cache = get_audio_cache()
+        key = tts_cache_key(text, voice_id, emotion)
+
+        audio = audio_cache.get(key)
+        span.cache_hit = audio is not None
+        if audio is not None:
+            emit(audio)
+            return audio, first_audio
+
+        def generate():
+            sample_rate = hume_client.sample_rate
+            segment_bytes = int(STREAM_SEGMENT_SECONDS * sample_rate) * 2
+
+            pcm = bytearray()
+            emitted = 0
+            for chunk in hume_client.stream_speech(text, character, emotion, voice_id=voice_id):
+                pcm += chunk
+                # A trailing half sample waits for the next chunk
+                end = len(pcm) // 2 * 2
+                if end - emitted >= segment_bytes:
+                    emit(pcm_to_wav(bytes(pcm[emitted:end]), sample_rate))
+                    emitted = end
+
+            end = len(pcm) // 2 * 2
+            if end > emitted:
+                emit(pcm_to_wav(bytes(pcm[emitted:end]), sample_rate))
+
+            if first_audio is None:
+                # Caching an empty clip would serve silence for this line from now on
+                raise ProviderError(f"{hume_client.provider} streamed no audio")
+
+            stream_audio = pcm_to_wav(bytes(pcm[:end]), sample_rate)
+            audio_cache.put(key, stream_audio)
+            return stream_audio
+
+        audio = get_single_flight("speech").do(key, generate)
+        if first_audio is None:
+            # Joined an identical request in flight, which hands over the finished clip
+            emit(audio)
+
+        span.size = len(audio)
+        return audio, first_audio
+
+
+def generate_audio_for_line(character, text, emotion="neutral"):
+    """Generate audio for a single line of dialogue"""
+    voice_id = st.session_state.character_voices.get(character, "voice1")
+
+    with timed("generate_audio_for_line") as span, st.spinner(f'Generating audio for {character}...'):
+        audio_url = synthesize_speech(text, character, emotion, voice_id)
+        span.size = len(audio_url)
+
+    return audio_url
+
+
+# Plays a stream's segments back to back in one player; see components/stream_player
+stream_player = components.declare_component(
+    "stream_player",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "stream_player")
+)
+
+
+def stream_audio_for_line(character, text, emotion="neutral"):
+    """Generate audio for a single line, playing it as it arrives
+
+    Every segment goes to the same stream player, which queues it behind
+    the ones before and hides itself once the stream has ended and played
+    out. The full clip is available once the stream ends.
+    """
+    voice_id = st.session_state.character_voices.get(character, "voice1")
+    player = st.empty()
+    stream_id = uuid.uuid4().hex
+    segments = []
+
+    def update(done=False):
+        # The player only sees its latest arguments, so they list every segment
+        with player:
+            stream_player(stream=stream_id, segments=segments, done=done, default=None)
+
+    def play(wav):
+        # Served like st.audio data, until the session's next run replaces this one
+        segments.append(runtime.get_instance().media_file_mgr.add(
+            wav, audio_mime_type(wav), f"stream_player.{stream_id}.{len(segments)}"
+        ))
+        update()
+
+    try:
+        audio_url, first_audio = stream_speech(text, character, emotion, voice_id, on_audio=play)
+    except Exception:
+        player.empty()
+        raise
+
+    update(done=True)
+    if first_audio is not None:
+        st.caption(f"First audio after {first_audio * 1000:.0f} ms")
+    return audio_url
+
+
+def load_dialogues(dialogues, audio_clips=None):
+    """Replace the session's dialogue lines and clips"""
+    audio_clips = audio_clips or {}
+    st.session_state.dialogues = DialogueTable.from_records(dialogues, audio_clips)
+    st.session_state.audio_clips = audio_clips
+    st.session_state.scene_index = SceneClipIndex.from_clips(audio_clips)
+    st.session_state.search_index = DialogueSearchIndex.from_dialogues(st.session_state.dialogues)
+
+
+def carry_over_clips(dialogues):
+    """Clips from the session's current dialogues for lines that survive into `dialogues`
+
+    Line ids follow speaker and text, so a line that is unchanged in a new
+    draft keeps its id. Such lines keep their emotion, and their clips are
+    updated with the line's new scene and position.
+    """
+    previous_emotions = st.session_state.dialogues.frame["emotion"]
+    clips = {}
+
+    for dialogue in dialogues:
+        line_id = dialogue["line_id"]
+        if line_id not in previous_emotions.index:
+            continue
+
+        dialogue["emotion"] = previous_emotions.at[line_id]
+        clip = st.session_state.audio_clips.get(line_id)
+        if clip is not None:
+            clips[line_id] = dict(
+                clip,
+                text=dialogue["text"],
+                scene_id=dialogue.get("scene_id", 1),
+                sequence=dialogue.get("sequence")
+            )
+
+    return clips
+
+
+def store_audio_clip(line_id, clip):
+    """Attach a generated clip to a dialogue line"""
+    st.session_state.audio_clips[line_id] = clip
+    st.session_state.dialogues.set_clip_status([line_id], True)
+    st.session_state.scene_index.add(line_id, clip)
+
+
+def clear_audio_clips():
+    """Remove every generated clip from the current script"""
+    st.session_state.audio_clips = {}
+    st.session_state.dialogues.set_clip_status(st.session_state.dialogues.frame.index, False)
+    st.session_state.scene_index = SceneClipIndex()
+
+
+def make_audio_clip(dialogue, audio_url, voice_id):
+    """Build the audio_clips entry for a generated dialogue line"""
+    emotion = dialogue.get("emotion", "neutral")
+    return {
+        "url": audio_url,
+        "character": dialogue["character"],
+        "text": dialogue["text"],
+        "emotion": emotion,
+        "scene_id": dialogue.get("scene_id", 1),
+        "sequence": dialogue.get("sequence"),
+        "cache_key": tts_cache_key(dialogue["text"], voice_id, emotion)
+    }
+
+
+def clip_is_current(dialogue, character_voices):
+    """Check whether a line's clip matches its current text, voice and emotion"""
+    clip = st.session_state.audio_clips.get(dialogue["line_id"])
+    if clip is None:
+        return False
+
+    voice_id = character_voices.get(dialogue["character"], "voice1")
+    return clip.get("cache_key") == tts_cache_key(dialogue["text"], voice_id, dialogue.get("emotion", "neutral"))
+
+
+def synthesize_speech_with_retry(text, character, emotion, voice_id, cancel_event=None):
+    """`synthesize_speech`, retried with exponential backoff on errors
+
+    Retries stop early once `cancel_event` is set.
+    """
+    stop = stop_after_attempt(TTS_MAX_ATTEMPTS)
+    if cancel_event is not None:
+        stop = stop | stop_when_event_set(cancel_event)
+
+    for attempt in Retrying(stop=stop, wait=wait_exponential(multiplier=0.5, max=30), reraise=True):
+        with attempt:
+            audio_url = synthesize_speech(text, character, emotion, voice_id)
+
+    return audio_url
+
+
+def generate_audio_batch(lines, character_voices, max_workers=MAX_TTS_CONCURRENCY, cancel_event=None):
+    """Generate audio for many dialogue lines concurrently
+
+    `lines` maps a dialogue key to its dialogue dict. Results are yielded as
+    (dialogue_key, audio_url, error) tuples in completion order, so callers can
+    store each clip and advance progress while the remaining calls are in flight.
+    Cached lines resolve without a HumeAI call, and failed calls are retried.
+    """
+    if not lines:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(lines))))
+    try:
+        futures = {
+            executor.submit(
+                synthesize_speech_with_retry,
+                dialogue["text"],
+                dialogue["character"],
+                dialogue.get("emotion", "neutral"),
+                character_voices.get(dialogue["character"], "voice1"),
+                cancel_event
+            ): dialogue_key
+            for dialogue_key, dialogue in lines.items()
+        }
+
+        for future in as_completed(futures):
+            dialogue_key = futures[future]
+            try:
+                yield dialogue_key, future.result(), None
+            except Exception as e:
+                yield dialogue_key, None, e
+    finally:
+        # Drop queued calls if the caller stops consuming early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AudioJob:
+    """Progress and results of one background audio generation job
+
+    Worker threads append finished clips to `results`; sessions read them
+    from their own cursor position, so nothing is lost between polls.
+    Finished jobs are kept for a while after their session is gone, so
+    results hold each clip without its audio, which stays in the TTS cache,
+    and `lines` is released once the job ends.
+    """
+
+    ACTIVE_STATUSES = ("queued", "running")
+
+    def __init__(self, lines, character_voices, max_workers):
+        self.id = uuid.uuid4().hex[:12]
+        self.lines = lines
+        self.character_voices = character_voices
+        self.max_workers = max_workers
+        self.status = "queued"
+        self.total = len(lines)
+        self.completed = 0
+        self.failed = 0
+        self.errors = []
+        self.results = []
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    @property
+    def progress(self):
+        return (self.completed + self.failed) / self.total if self.total else 1.0
+
+
+class AudioJobQueue:
+    """Runs dialogue audio generation jobs on background worker threads
+
+    Jobs outlive the script run that submitted them, so navigating to
+    another page or rerunning doesn't interrupt generation.
+    """
+
+    def __init__(self, max_running=MAX_RUNNING_AUDIO_JOBS):
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix="audio-job")
+
+    def submit(self, lines, character_voices, max_workers=MAX_TTS_CONCURRENCY):
+        """Queue generation for `lines` (line_id -> dialogue) and return the job id"""
+        job = AudioJob(lines, character_voices, max_workers)
+
+        with self._lock:
+            cutoff = time.time() - AUDIO_JOB_RETENTION_SECONDS
+            for job_id in [job_id for job_id, old in self._jobs.items() if old.finished and old.finished < cutoff]:
+                del self._jobs[job_id]
+            self._jobs[job.id] = job
+
+        self._workers.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None and job.active:
+            job.cancel_event.set()
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished = time.time()
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.lines = None
+            return
+
+        job.status = "running"
+        batch = generate_audio_batch(job.lines, job.character_voices, job.max_workers, job.cancel_event)
+        try:
+            for line_id, audio_url, error in batch:
+                if error is None:
+                    dialogue = job.lines[line_id]
+                    voice_id = job.character_voices.get(dialogue["character"], "voice1")
+                    clip = make_audio_clip(dialogue, audio_url, voice_id)
+                    del clip["url"]
+                    job.results.append((line_id, clip))
+                    job.completed += 1
+                else:
+                    job.errors.append(f"{job.lines[line_id]['character']}: {error}")
+                    job.failed += 1
+
+                if job.cancel_event.is_set():
+                    break
+
+            if job.completed + job.failed < job.total:
+                job.status = "cancelled"
+            else:
+                job.status = "failed" if job.failed == job.total else "done"
+        except Exception as e:
+            job.errors.append(str(e))
+            job.status = "failed"
+        finally:
+            batch.close()
+            job.lines = None
+            job.finished = time.time()
+
+
+@st.cache_resource
+def get_audio_job_queue():
+    """Background job queue shared by all sessions and reruns"""
+    return AudioJobQueue()
+
+
+def collect_audio_job_results():
+    """Move clips finished by this session's background jobs into the session
+
+    Returns True while any of the session's jobs is still running.
+    """
+    job_queue = get_audio_job_queue()
+    audio_cache = get_audio_cache()
+    line_ids = st.session_state.dialogues.frame.index
+    active = False
+
+    for job_id in st.session_state.audio_jobs:
+        job = job_queue.get(job_id)
+        if job is None:
+            continue
+
+        cursor = st.session_state.audio_job_cursors.get(job_id, 0)
+        new_results = job.results[cursor:]
+        for line_id, clip in new_results:
+            # Skip lines that vanished because another script was loaded meanwhile
+            if line_id not in line_ids:
+                continue
+            # A clip evicted from the cache since is left for regeneration
+            audio_url = audio_cache.peek(clip["cache_key"])
+            if audio_url is None:
+                evicted = st.session_state.audio_job_evicted
+                evicted[job_id] = evicted.get(job_id, 0) + 1
+            else:
+                store_audio_clip(line_id, {**clip, "url": audio_url})
+        st.session_state.audio_job_cursors[job_id] = cursor + len(new_results)
+
+        active = active or job.active
+
+    return active
+
+
+class AudioPrefetcher:
+    """Speculatively generates audio for lines a user is about to reach
+
+    Lines are queued by how soon they come up, so every session's next line
+    is served before anyone's later ones. Each session may have at most
+    `budget` lines queued or in flight. Prefetching under a new context
+    (another scene, another line) cancels the lines still queued for the
+    previous one. Finished clips wait in the session's outbox until its
+    next rerun collects them.
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS, budget=PREFETCH_BUDGET_LINES):
+        self.budget = budget
+        self._queue = []
+        self._order = itertools.count()
+        self._sessions = {}
+        self._cond = threading.Condition()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"audio-prefetch-{i}", daemon=True).start()
+
+    def _session(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = {
+                "context": None, "epoch": 0, "outstanding": set(), "failed": set(), "results": []
+            }
+        session["seen"] = time.time()
+        return session
+
+    @staticmethod
+    def _cancel(session):
+        # Queued entries from older epochs are skipped when popped
+        session["epoch"] += 1
+        session["outstanding"].clear()
+        session["failed"].clear()
+
+    def prefetch(self, session_id, context, lines, character_voices):
+        """Queue `lines` (dialogue dicts, most urgent first) for `session_id`
+
+        Returns the number of the session's lines queued or in flight.
+        """
+        with self._cond:
+            cutoff = time.time() - AUDIO_JOB_RETENTION_SECONDS
+            for stale in [sid for sid, s in self._sessions.items() if s["seen"] < cutoff]:
+                del self._sessions[stale]
+
+            session = self._session(session_id)
+            if context != session["context"]:
+                self._cancel(session)
+                session["context"] = context
+
+            queued = 0
+            for priority, dialogue in enumerate(lines):
+                if len(session["outstanding"]) >= self.budget:
+                    break
+                line_id = dialogue["line_id"]
+                if line_id in session["outstanding"] or line_id in session["failed"]:
+                    continue
+
+                voice_id = character_voices.get(dialogue["character"], "voice1")
+                session["outstanding"].add(line_id)
+                heapq.heappush(
+                    self._queue,
+                    (priority, next(self._order), session_id, session["epoch"], dialogue, voice_id)
+                )
+                queued += 1
+
+            if queued:
+                self._cond.notify(queued)
+            return len(session["outstanding"])
+
+    def cancel(self, session_id):
+        """Drop the session's queued lines; lines already in flight still finish"""
+        with self._cond:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._cancel(session)
+                session["context"] = None
+
+    def status(self, session_id):
+        """(clips waiting to be collected, lines queued or in flight) for a session"""
+        with self._cond:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return 0, 0
+            return len(session["results"]), len(session["outstanding"])
+
+    def collect(self, session_id):
+        """Take the session's finished (line_id, clip) pairs"""
+        with self._cond:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            results, session["results"] = session["results"], []
+            return results
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                _, _, session_id, epoch, dialogue, voice_id = heapq.heappop(self._queue)
+                session = self._sessions.get(session_id)
+                if session is None or epoch != session["epoch"]:
+                    continue
 
+            line_id = dialogue["line_id"]
+            try:
+                audio_url = synthesize_speech(
+                    dialogue["text"], dialogue["character"], dialogue.get("emotion", "neutral"), voice_id
+                )
+            except Exception:
+                # Speculative work isn't retried; explicit generation still can be
+                with self._cond:
+                    if epoch == session["epoch"]:
+                        session["outstanding"].discard(line_id)
+                        session["failed"].add(line_id)
+                continue
 
-class HumeAIClient:
-    def generate_speech(self, text, character, emotion="neutral"):
-        """Mock function for generating speech with HumeAI"""
-        # In production, this would call HumeAI API
-        time.sleep(0.5)  # Simulate API call
-        
-        # In a real implementation, this would return the audio file path
-        audio_file = f"audio_{uuid.uuid4().hex[:8]}.mp3"
-        
-        # For demo purposes, return a mock audio path
-        return f"https://example.com/audio/{audio_file}"
-    
-    def get_available_voices(self):
-        """Get available voice options"""
-        return [
-            {"id": "voice1", "name": "Male Deep", "gender": "male", "age": "adult"},
-            {"id": "voice2", "name": "Female Warm", "gender": "female", "age": "adult"},
-            {"id": "voice3", "name": "Male Raspy", "gender": "male", "age": "older"},
-            {"id": "voice4", "name": "Female Young", "gender": "female", "age": "young"},
-            {"id": "voice5", "name": "Neutral", "gender": "neutral", "age": "adult"}
-        ]
+            with self._cond:
+                if epoch == session["epoch"]:
+                    session["outstanding"].discard(line_id)
+                # Clips finished after a cancel are still valid audio for the session
+                session["results"].append((line_id, make_audio_clip(dialogue, audio_url, voice_id)))
 
 
-# Initialize API clients
-openai_client = OpenAIClient()
-hume_client = HumeAIClient()
+@st.cache_resource
+def get_audio_prefetcher():
+    """Prefetcher shared by all sessions and reruns"""
+    return AudioPrefetcher()
 
-# Set page configuration
-st.set_page_config(
-    page_title="AI Script Reader Platform",
-    page_icon="🎬",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
 
-# Session state initialization
-if 'current_script' not in st.session_state:
-    st.session_state.current_script = None
-if 'script_analysis' not in st.session_state:
-    st.session_state.script_analysis = None
-if 'dialogues' not in st.session_state:
-    st.session_state.dialogues = []
-if 'audio_clips' not in st.session_state:
-    st.session_state.audio_clips = {}
-if 'character_voices' not in st.session_state:
-    st.session_state.character_voices = {}
-if 'projects' not in st.session_state:
-    st.session_state.projects = []
+def prefetch_audio(context, dialogues):
+    """Speculatively generate `dialogues`, in order, that lack up-to-date audio
 
+    Returns the number of this session's lines queued or in flight.
+    """
+    character_voices = dict(st.session_state.character_voices)
+    lines = [dialogue for dialogue in dialogues if not clip_is_current(dialogue, character_voices)]
+    return get_audio_prefetcher().prefetch(st.session_state.session_id, context, lines, character_voices)
 
-def extract_text_from_docx(file):
-    """Extract text content from a .docx file"""
-    doc = docx.Document(file)
-    full_text = []
-    for para in doc.paragraphs:
-        full_text.append(para.text)
-    return '\n'.join(full_text)
 
+def collect_prefetched_audio():
+    """Move clips the prefetcher finished for this session into the session
 
-def extract_text_from_pdf(file):
-    """Extract text content from a .pdf file"""
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ''
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
+    Clips for lines that were removed, or whose voice or emotion changed
+    since they were queued, are dropped.
+    """
+    line_ids = st.session_state.dialogues.frame.index
+    character_voices = st.session_state.character_voices
 
+    for line_id, clip in get_audio_prefetcher().collect(st.session_state.session_id):
+        if line_id not in line_ids:
+            continue
+        dialogue = st.session_state.dialogues.get(line_id)
+        voice_id = character_voices.get(dialogue["character"], "voice1")
+        if clip["cache_key"] == tts_cache_key(dialogue["text"], voice_id, dialogue["emotion"]):
+            store_audio_clip(line_id, clip)
 
-def process_uploaded_script(uploaded_file):
-    """Process an uploaded script file"""
-    if uploaded_file is None:
-        return None
-    
-    file_extension = uploaded_file.name.split('.')[-1].lower()
-    
-    if file_extension == 'txt':
-        script_content = uploaded_file.getvalue().decode('utf-8')
-    elif file_extension == 'docx':
-        script_content = extract_text_from_docx(uploaded_file)
-    elif file_extension == 'pdf':
-        script_content = extract_text_from_pdf(uploaded_file)
-    else:
-        st.error(f"Unsupported file format: {file_extension}")
-        return None
-    
-    return script_content
 
+def render_prefetch_status():
+    """Show speculative generation progress, rerunning the page as clips arrive"""
+    ready, outstanding = get_audio_prefetcher().status(st.session_state.session_id)
+    if ready or not outstanding:
+        st.rerun()
+    st.caption(f"Preparing audio for {outstanding} upcoming line{'s' if outstanding != 1 else ''}...")
 
-def analyze_script(script_content):
-    """Analyze script content using OpenAI"""
-    with st.spinner('Analyzing script...'):
-        analysis = openai_client.analyze_script(script_content)
-        dialogues = openai_client.extract_dialogue(script_content)
-        
-        return analysis, dialogues
 
+# Polls every second while lines are being prefetched
+render_prefetch_status_live = st.fragment(run_every=1)(render_prefetch_status)
 
-def generate_audio_for_line(character, text, emotion="neutral"):
-    """Generate audio for a single line of dialogue"""
-    voice_id = st.session_state.character_voices.get(character, "voice1")
-    
-    with st.spinner(f'Generating audio for {character}...'):
-        audio_url = hume_client.generate_speech(text, character, emotion)
-        
-    return audio_url
+
+def audio_mime_type(audio):
+    """Guess the MIME type of a clip's audio (bytes, URL or file path)"""
+    if isinstance(audio, bytes):
+        return 'audio/wav' if audio[:4] == b"RIFF" else 'audio/mp3'
+    return 'audio/wav' if str(audio).endswith('.wav') else 'audio/mp3'
+
+
+def clip_audio(clip):
+    """A clip's audio, read from its saved project if it was loaded without it"""
+    if "url" in clip:
+        return clip["url"]
+    if clip.get("audio_ref"):
+        return get_project_store().load_clip_audio(*clip["audio_ref"])
+    return None
 
 
 def display_audio_player(url, character, text):
     """Display an audio player for a generated line"""
-    st.audio(url, format='audio/mp3')
+    st.audio(url, format=audio_mime_type(url))
     st.caption(f"**{character}**: {text}")
 
 
+def assemble_scene_track(clips, gap_ms, out_path):
+    """Join WAV clips, in order, into a single track with silent gaps
+
+    Frames are copied block by block from each clip to the output file, so
+    the scene is never decoded into memory as a whole. All clips must share
+    the same channel count, sample width and sample rate.
+    """
+    tmp_path = f"{out_path}.{uuid.uuid4().hex[:8]}.tmp"
+    params = None
+
+    try:
+        with wave.open(tmp_path, 'wb') as track:
+            for i, clip in enumerate(clips):
+                audio = clip_audio(clip)
+                if not isinstance(audio, bytes):
+                    raise ValueError(f"Clip for {clip['character']} has no audio data; regenerate it first.")
+
+                with wave.open(io.BytesIO(audio), 'rb') as source:
+                    clip_params = (source.getnchannels(), source.getsampwidth(), source.getframerate())
+                    if params is None:
+                        params = clip_params
+                        track.setnchannels(params[0])
+                        track.setsampwidth(params[1])
+                        track.setframerate(params[2])
+                    elif clip_params != params:
+                        raise ValueError(f"Clip for {clip['character']} uses a different audio format.")
+
+                    if i > 0 and gap_ms > 0:
+                        silent_frames = int(params[2] * gap_ms / 1000)
+                        silence = bytes(min(silent_frames, TRACK_BLOCK_FRAMES) * params[0] * params[1])
+                        while silent_frames > 0:
+                            count = min(silent_frames, TRACK_BLOCK_FRAMES)
+                            track.writeframes(silence[:count * params[0] * params[1]])
+                            silent_frames -= count
+
+                    while True:
+                        frames = source.readframes(TRACK_BLOCK_FRAMES)
+                        if not frames:
+                            break
+                        track.writeframes(frames)
+
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return out_path
+
+
+def get_scene_track(clips, gap_ms):
+    """Return the path of the assembled track for these clips
+
+    Tracks are content-addressed by the clips' cache keys and the gap, so a
+    scene is only rebuilt when one of its clips (or the gap) changes.
+    """
+    track_dir = os.path.join(DATA_DIR, "tracks")
+    os.makedirs(track_dir, exist_ok=True)
+
+    key = hashlib.sha256(json.dumps([gap_ms] + [clip.get("cache_key") for clip in clips]).encode('utf-8')).hexdigest()
+    path = os.path.join(track_dir, f"{key}.wav")
+
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    assemble_scene_track(clips, gap_ms, path)
+    prune_track_cache(track_dir, keep=path)
+    return path
+
+
+def prune_track_cache(track_dir, keep, max_bytes=SCENE_TRACK_CACHE_MAX_BYTES):
+    """Delete least recently used tracks until the directory fits in max_bytes"""
+    tracks = []
+    for entry in os.scandir(track_dir):
+        if entry.name.endswith('.wav'):
+            stat = entry.stat()
+            tracks.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in tracks)
+    for _, size, path in sorted(tracks):
+        if total <= max_bytes:
+            break
+        if path != keep:
+            os.remove(path)
+            total -= size
+
+
+def normalize_effects(effects):
+    """Playback effects with defaults filled in and slider values rounded"""
+    effects = {**DEFAULT_CLIP_EFFECTS, **(effects or {})}
+    return {
+        "speed": round(float(effects["speed"]), 2),
+        "volume": round(float(effects["volume"]), 2),
+        "sfx": sorted({name for name in effects["sfx"] if name in SFX_BED_SHAPES}),
+    }
+
+
+def decode_wav(audio):
+    """(samples, sample_rate) for 16-bit WAV bytes, as float32 frames x channels"""
+    with wave.open(io.BytesIO(audio), 'rb') as source:
+        if source.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM clips can be processed.")
+        channels, sample_rate = source.getnchannels(), source.getframerate()
+        pcm = source.readframes(source.getnframes())
+
+    return np.frombuffer(pcm, dtype='<i2').reshape(-1, channels).astype(np.float32) / 32768, sample_rate
+
+
+def encode_wav(samples, sample_rate):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    return pcm_to_wav(pcm.tobytes(), sample_rate, channels=samples.shape[1])
+
+
+def time_stretch_batch(signals, speed, frame):
+    """Play several signals `speed` times faster without changing their pitch
+
+    WSOLA: output frames overlap by half, and each is read from within a
+    small tolerance of its nominal input position, at the offset whose
+    waveform best continues the previous frame (by FFT cross-correlation).
+    All signals are stretched in lockstep, one frame of every signal still
+    running per step, so the search is vectorized across the batch.
+    """
+    hop = frame // 2
+    tolerance = hop // 2
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)).astype(np.float32)
+    channels = signals[0].shape[1]
+    lengths = np.array([len(signal) for signal in signals])
+    counts = np.ceil(lengths / speed / hop).astype(np.int64) + 1
+
+    # One buffer holds every signal, padded so that reads near its ends stay inside its own slot
+    pad_after = 2 * int(np.ceil(hop * speed)) + 2 * tolerance + 2 * frame
+    offsets = np.concatenate([[0], np.cumsum(lengths + tolerance + pad_after)[:-1]])
+    buffer = np.zeros((int(offsets[-1] + lengths[-1] + tolerance + pad_after), channels), np.float32)
+    for signal, offset in zip(signals, offsets):
+        buffer[offset + tolerance:offset + tolerance + len(signal)] = signal
+    mono = buffer.mean(axis=1)
+
+    # Longest first, so the signals still running are always a prefix
+    order = np.argsort(-counts, kind='stable')
+    slot_offsets, slot_counts = offsets[order], counts[order]
+    starts = np.zeros((len(signals), counts.max()), np.int64)
+    starts[:, 0] = slot_offsets + tolerance
+
+    candidates = np.arange(2 * tolerance + frame)
+    columns = np.arange(frame)
+    nfft = 1 << int(2 * tolerance + frame - 1).bit_length()
+    for k in range(1, counts.max()):
+        running = np.count_nonzero(slot_counts > k)
+        region_starts = slot_offsets[:running] + int(round(k * hop * speed))
+        region = mono[region_starts[:, None] + candidates]
+        previous = mono[(starts[:running, k - 1] + hop)[:, None] + columns]
+        correlation = np.fft.irfft(
+            np.fft.rfft(region, nfft) * np.conj(np.fft.rfft(previous, nfft)), nfft
+        )[:, :2 * tolerance + 1]
+        starts[:running, k] = region_starts + correlation.argmax(axis=1)
+
+    stretched = [None] * len(signals)
+    for slot, i in enumerate(order):
+        frames = buffer[starts[slot, :counts[i]][:, None] + columns] * window[:, None]
+        out = np.zeros(((counts[i] + 1) * hop, channels), np.float32)
+        out[:-hop] += frames[:, :hop].reshape(-1, channels)
+        out[hop:] += frames[:, hop:].reshape(-1, channels)
+        stretched[i] = out[:int(round(lengths[i] / speed))]
+    return stretched
+
+
+@functools.lru_cache(maxsize=2 * len(SFX_BED_SHAPES))
+def sfx_bed(name, sample_rate):
+    """SFX_BED_SECONDS of synthesized background noise, peak 1
+
+    The noise is shaped in the frequency domain, so it loops seamlessly.
+    """
+    response, swell_depth, swell_cycles = SFX_BED_SHAPES[name]
+    n = SFX_BED_SECONDS * sample_rate
+    rng = np.random.default_rng(list(SFX_BED_SHAPES).index(name))
+
+    freqs = np.fft.rfftfreq(n, 1 / sample_rate)
+    spectrum = (rng.standard_normal(len(freqs)) + 1j * rng.standard_normal(len(freqs))) * response(freqs)
+    bed = np.fft.irfft(spectrum, n)
+    bed *= 1 + swell_depth * np.sin(2 * np.pi * swell_cycles * np.arange(n) / n)
+    return (bed / np.abs(bed).max()).astype(np.float32)
+
+
+def apply_effects_batch(signals, sample_rate, effects):
+    """Render one set of playback effects onto several signals of one sample rate"""
+    if effects["speed"] != 1.0:
+        frame = int(sample_rate * STRETCH_FRAME_SECONDS) // 2 * 2
+        signals = time_stretch_batch(signals, effects["speed"], frame)
+
+    bed = None
+    if effects["sfx"]:
+        bed = SFX_BED_GAIN * sum(sfx_bed(name, sample_rate) for name in effects["sfx"]) / len(effects["sfx"])
+
+    rendered = []
+    for signal in signals:
+        signal = signal * effects["volume"]
+        if bed is not None:
+            signal += np.resize(bed, len(signal))[:, None]
+        rendered.append(signal)
+    return rendered
+
+
+def render_clip_effects(clips):
+    """Copies of `clips` with their playback effects rendered into the audio
+
+    Rendered variants are cached by the clip's audio and the effect
+    parameters, and each copy's cache_key names its variant. Cache misses
+    that share parameters and format are rendered together in one batch.
+    Clips without effects are returned unchanged.
+    """
+    with timed("render_clip_effects") as span:
+        variant_cache = get_variant_cache()
+        rendered = list(clips)
+        pending = {}
+
+        for i, clip in enumerate(clips):
+            effects = normalize_effects(clip.get("effects"))
+            if effects == DEFAULT_CLIP_EFFECTS:
+                continue
+
+            key = hashlib.sha256(
+                json.dumps([EFFECTS_ENGINE_VERSION, clip.get("cache_key"), effects], sort_keys=True).encode('utf-8')
+            ).hexdigest()
+            audio = variant_cache.get(key)
+            if audio is not None:
+                rendered[i] = {**clip, "url": audio, "cache_key": key}
+                continue
+
+            source = clip_audio(clip)
+            if not isinstance(source, bytes):
+                raise ValueError(f"Clip for {clip['character']} has no audio data; regenerate it first.")
+            samples, sample_rate = decode_wav(source)
+            group = (json.dumps(effects, sort_keys=True), sample_rate, samples.shape[1])
+            pending.setdefault(group, []).append((i, key, samples))
+
+        span.cache_hit = not pending
+        for (effects, sample_rate, _), group in pending.items():
+            signals = apply_effects_batch([samples for _, _, samples in group], sample_rate, json.loads(effects))
+            for (i, key, _), samples in zip(group, signals):
+                audio = encode_wav(samples, sample_rate)
+                variant_cache.put(key, audio)
+                rendered[i] = {**clips[i], "url": audio, "cache_key": key}
+
+        return rendered
+
+
 def save_project(project_name):
     """Save current project data"""
-    project = {
-        "name": project_name,
-        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "script_name": st.session_state.current_script.name if st.session_state.current_script else "Untitled",
-        "analysis": st.session_state.script_analysis,
-        "dialogues": st.session_state.dialogues,
-        "audio_clips": st.session_state.audio_clips,
-        "character_voices": st.session_state.character_voices
-    }
+    written = get_project_store().save_project(
+        project_name,
+        st.session_state.current_script.name if st.session_state.current_script else "Untitled",
+        st.session_state.script_analysis,
+        st.session_state.dialogues.records(),
+        st.session_state.audio_clips,
+        st.session_state.character_voices
+    )
     
-    st.session_state.projects.append(project)
-    st.success(f"Project '{project_name}' saved!")
+    st.success(f"Project '{project_name}' saved! ({written} changed rows written)")
+
+
+def write_project_archive(fileobj, manifest, analysis, dialogues, audio_clips):
+    """Write a project archive to `fileobj` one member at a time
+
+    The archive is a zip holding manifest.json, analysis.json,
+    dialogues.jsonl, audio/<cache key> blobs (stored uncompressed and
+    shared by identical lines) and clips.jsonl. Audio is copied clip by
+    clip, so no more than one clip is buffered at once.
+    """
+    manifest = dict(manifest, format=PROJECT_ARCHIVE_FORMAT, version=PROJECT_ARCHIVE_VERSION)
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("manifest.json", json.dumps(manifest))
+        archive.writestr("analysis.json", json.dumps(analysis))
+
+        with archive.open("dialogues.jsonl", "w") as out:
+            for dialogue in dialogues:
+                out.write((json.dumps(dialogue) + "\n").encode('utf-8'))
+
+        clip_entries = []
+        for line_id, clip in audio_clips.items():
+            entry = {k: v for k, v in clip.items() if k not in ("url", "audio_ref")}
+            entry["line_id"] = line_id
+
+            audio = clip_audio(clip)
+            if isinstance(audio, bytes):
+                extension = ".wav" if audio_mime_type(audio) == "audio/wav" else ".mp3"
+                member = f"audio/{clip.get('cache_key') or line_id}{extension}"
+                if member not in archive.NameToInfo:
+                    archive.writestr(zipfile.ZipInfo(member), audio, compress_type=zipfile.ZIP_STORED)
+                entry["audio"] = member
+            else:
+                entry["url"] = audio
+            clip_entries.append(entry)
+
+        with archive.open("clips.jsonl", "w") as out:
+            for entry in clip_entries:
+                out.write((json.dumps(entry) + "\n").encode('utf-8'))
+
+
+class ProjectArchive:
+    """Read access to a project archive written by `write_project_archive`
+
+    Opening reads only the manifest. Analysis, dialogues and clips are read
+    when asked for, and each clip's audio is loaded only as that clip is
+    consumed.
+    """
+
+    def __init__(self, fileobj):
+        self._zip = zipfile.ZipFile(fileobj)
+        self.manifest = json.loads(self._zip.read("manifest.json"))
+
+        if self.manifest.get("format") != PROJECT_ARCHIVE_FORMAT:
+            raise ValueError("not a script reader project archive")
+        if self.manifest.get("version", 0) > PROJECT_ARCHIVE_VERSION:
+            raise ValueError(f"archive version {self.manifest['version']} is newer than this app supports")
+        name = self.manifest.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("archive manifest has no project name")
+
+    def analysis(self):
+        return json.loads(self._zip.read("analysis.json"))
+
+    def _read_lines(self, member):
+        with self._zip.open(member) as raw:
+            for line in io.TextIOWrapper(raw, encoding='utf-8'):
+                if line.strip():
+                    yield json.loads(line)
+
+    def dialogues(self):
+        """Yield dialogue dicts in script order"""
+        return self._read_lines("dialogues.jsonl")
+
+    def read_audio(self, member):
+        return self._zip.read(member)
+
+    def clips(self):
+        """Yield (line_id, clip) pairs, loading each clip's audio as it's reached"""
+        for entry in self._read_lines("clips.jsonl"):
+            line_id = entry.pop("line_id")
+            member = entry.pop("audio", None)
+            if member is not None:
+                entry["url"] = self.read_audio(member)
+            yield line_id, entry
+
+    def close(self):
+        self._zip.close()
+
+
+def export_current_project(project_name):
+    """Write the session's project to a temporary archive file and return its path"""
+    with tempfile.NamedTemporaryFile(suffix=".srproj", delete=False) as archive_file:
+        write_project_archive(
+            archive_file,
+            {
+                "name": project_name,
+                "script_name": st.session_state.current_script.name if st.session_state.current_script else "Untitled",
+                "created": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                "dialogue_count": len(st.session_state.dialogues),
+                "clip_count": len(st.session_state.audio_clips),
+                "character_voices": st.session_state.character_voices
+            },
+            st.session_state.script_analysis,
+            st.session_state.dialogues,
+            st.session_state.audio_clips
+        )
+
+    return archive_file.name
+
+
+def import_project_archive(archive):
+    """Stream an archive into the project store and return the new project id"""
+    project_store = get_project_store()
+    manifest = archive.manifest
+
+    name = manifest["name"]
+    if project_store.find_project(name) is not None:
+        # save_project overwrites by name, so keep looking until the name is free
+        imported = f"{name} (imported {datetime.now().strftime('%Y-%m-%d %H:%M')})"
+        name = imported
+        for n in itertools.count(2):
+            if project_store.find_project(name) is None:
+                break
+            name = f"{imported} ({n})"
+
+    project_store.save_project(
+        name,
+        manifest.get("script_name", "Untitled"),
+        archive.analysis(),
+        list(archive.dialogues()),
+        {},
+        manifest.get("character_voices", {})
+    )
+    project_id = project_store.find_project(name)
+    project_store.add_clips(project_id, archive.clips())
+    return project_id
+
+
+def load_saved_project(project_id):
+    """Load a saved project into the session; returns its name, or None if missing"""
+    loaded = get_project_store().load_project(project_id)
+    if loaded is None:
+        return None
+
+    st.session_state.current_script = type('obj', (object,), {'name': loaded['script_name']})
+    st.session_state.script_analysis = loaded['analysis']
+    # Saved projects don't keep the script text, so the next draft is analyzed in full
+    st.session_state.script_content = None
+    load_dialogues(loaded['dialogues'], loaded['audio_clips'])
+    st.session_state.character_voices = loaded['character_voices']
+    return loaded['name']
 
 
 # UI Components
@@ -201,9 +2907,13 @@ def sidebar_menu():
     """Render the sidebar menu"""
     st.sidebar.title("AI Script Reader")
     
-    menu = st.sidebar.radio("Navigation", 
-                          ["Upload Script", "Script Analysis", "Audio Generation", 
-                           "Scene Playback", "Project Management"])
+    pages = ["Upload Script", "Script Analysis", "Audio Generation",
+             "Scene Playback", "Project Management"]
+    # Hidden unless the app is opened with ?diagnostics in the URL
+    if "diagnostics" in st.query_params:
+        pages.append("Diagnostics")
+
+    menu = st.sidebar.radio("Navigation", pages)
     
     st.sidebar.markdown("---")
     
@@ -240,11 +2950,18 @@ def upload_script_page():
             script_content = process_uploaded_script(uploaded_file)
             
             if script_content:
+                # A script that is already loaded may be the previous draft; it's
+                # only used as one if the two share most of their scenes
+                analysis, dialogues = analyze_script(
+                    script_content,
+                    previous_content=st.session_state.script_content,
+                    previous_analysis=st.session_state.script_analysis
+                )
+                audio_clips = carry_over_clips(dialogues)
                 st.session_state.current_script = uploaded_file
-                analysis, dialogues = analyze_script(script_content)
+                st.session_state.script_content = script_content
                 st.session_state.script_analysis = analysis
-                st.session_state.dialogues = dialogues
-                st.session_state.audio_clips = {}
+                load_dialogues(dialogues, audio_clips)
                 
                 # Initialize character voices with default values
                 for character in analysis.get("characters", []):
@@ -257,9 +2974,9 @@ def upload_script_page():
     with col2:
         if st.button("Clear Data", disabled=st.session_state.current_script is None):
             st.session_state.current_script = None
+            st.session_state.script_content = None
             st.session_state.script_analysis = None
-            st.session_state.dialogues = []
-            st.session_state.audio_clips = {}
+            load_dialogues([])
             st.success("Data cleared successfully!")
             st.rerun()
     
@@ -298,9 +3015,9 @@ def upload_script_page():
             
             st.session_state.current_script = uploaded_file
             analysis, dialogues = analyze_script(template_content)
+            st.session_state.script_content = template_content
             st.session_state.script_analysis = analysis
-            st.session_state.dialogues = dialogues
-            st.session_state.audio_clips = {}
+            load_dialogues(dialogues)
             
             # Initialize character voices
             for character in analysis.get("characters", []):
@@ -346,7 +3063,10 @@ def script_analysis_page():
     
     # Character analysis
     st.subheader("Characters")
+    character_counts = st.session_state.dialogues.character_counts()
+    scene_counts = st.session_state.dialogues.scene_counts()
     character_tabs = st.tabs(analysis.get("characters", ["No characters"]))
+    voice_options = {v["id"]: v["name"] for v in get_voice_catalog()}
     
     for i, tab in enumerate(character_tabs):
         if i < len(analysis.get("characters", [])):
@@ -355,11 +3075,10 @@ def script_analysis_page():
                 character_details = analysis.get("character_details", {}).get(character, {})
                 st.markdown(f"**Description:** {character_details.get('description', 'No description available')}")
                 st.markdown(f"**Emotional Baseline:** {character_details.get('emotion_baseline', 'Neutral')}")
+                if character in character_counts.index:
+                    st.markdown(f"**Dialogue Lines:** {character_counts.at[character, 'lines']}")
                 
                 # Voice selection
-                available_voices = hume_client.get_available_voices()
-                voice_options = {v["id"]: v["name"] for v in available_voices}
-                
                 selected_voice = st.selectbox(
                     "Assign Voice",
                     options=list(voice_options.keys()),
@@ -376,6 +3095,8 @@ def script_analysis_page():
         with st.expander(f"Scene {scene['id']}: {scene['name']}"):
             st.markdown(f"**Tone:** {scene.get('tone', 'Not specified')}")
             st.markdown(f"**Characters:** {', '.join(scene.get('characters', []))}")
+            if scene['id'] in scene_counts.index:
+                st.markdown(f"**Dialogue Lines:** {scene_counts.at[scene['id'], 'lines']}")
             
             if scene.get('props'):
                 st.markdown(f"**Props:** {', '.join(scene.get('props', []))}")
@@ -390,7 +3111,7 @@ def audio_generation_page():
     """Page for generating audio from dialogue"""
     st.header("Audio Generation")
     
-    if st.session_state.dialogues == []:
+    if len(st.session_state.dialogues) == 0:
         st.warning("Please upload and process a script first.")
         return
     
@@ -400,156 +3121,325 @@ def audio_generation_page():
     col1, col2 = st.columns([1, 1])
     
     with col1:
+        concurrency = st.number_input(
+            "Parallel Requests",
+            min_value=1,
+            max_value=64,
+            value=MAX_TTS_CONCURRENCY,
+            help="Maximum number of speech requests sent at the same time"
+        )
+
         if st.button("Generate All Dialogue Audio"):
-            with st.spinner("Generating audio for all dialogue lines..."):
-                progress_bar = st.progress(0)
-                
-                for i, dialogue in enumerate(st.session_state.dialogues):
-                    character = dialogue["character"]
-                    text = dialogue["text"]
-                    emotion = dialogue.get("emotion", "neutral")
-                    
-                    # Generate unique key for this dialogue
-                    dialogue_key = f"{character}_{i}"
-                    
-                    if dialogue_key not in st.session_state.audio_clips:
-                        audio_url = generate_audio_for_line(character, text, emotion)
-                        st.session_state.audio_clips[dialogue_key] = {
-                            "url": audio_url,
-                            "character": character,
-                            "text": text,
-                            "emotion": emotion,
-                            "scene_id": dialogue.get("scene_id", 1)
-                        }
-                    
-                    # Update progress
-                    progress_bar.progress((i + 1) / len(st.session_state.dialogues))
-                
-                st.success(f"Generated audio for {len(st.session_state.dialogues)} dialogue lines!")
+            # Only lines without an up-to-date clip need generating
+            character_voices = dict(st.session_state.character_voices)
+            pending = {}
+            for dialogue in st.session_state.dialogues:
+                if not clip_is_current(dialogue, character_voices):
+                    pending[dialogue["line_id"]] = dialogue
+
+            if pending:
+                job_id = get_audio_job_queue().submit(pending, character_voices, max_workers=int(concurrency))
+                st.session_state.audio_jobs.append(job_id)
+            else:
+                st.info("All dialogue lines already have up-to-date audio.")
     
     with col2:
         if st.button("Clear All Generated Audio", disabled=not st.session_state.audio_clips):
-            st.session_state.audio_clips = {}
+            clear_audio_clips()
             st.success("All audio clips cleared!")
+
+    if collect_audio_job_results():
+        render_audio_jobs_live()
+    else:
+        render_audio_jobs()
+
+    cache_stats = get_audio_cache().stats()
+    stat_col1, stat_col2, stat_col3 = st.columns(3)
+    stat_col1.metric("Cache Hits", cache_stats["hits"])
+    stat_col2.metric("Cache Misses", cache_stats["misses"])
+    stat_col3.metric("Cached Clips", cache_stats["entries"], help=f"{cache_stats['bytes'] / (1024 * 1024):.1f} MB on disk")
+
+    with st.expander("Provider Status"):
+        provider_stats = hume_client.transport.stats()
+        st.markdown(
+            f"**HumeAI:** {provider_stats['calls']} calls, {provider_stats['errors']} errors, "
+            f"{provider_stats['throttled']} rate-limited, circuit {provider_stats['circuit']}"
+        )
+        st.markdown(
+            f"**Latency:** p50 {provider_stats['latency_p50'] * 1000:.0f} ms, "
+            f"p95 {provider_stats['latency_p95'] * 1000:.0f} ms, "
+            f"max {provider_stats['latency_max'] * 1000:.0f} ms"
+        )
+        speech_flights = get_single_flight("speech").stats()
+        analysis_flights = get_single_flight("analysis").stats()
+        st.markdown(
+            f"**Shared Requests:** {speech_flights['shared']} speech and {analysis_flights['shared']} "
+            f"analysis calls saved by joining identical requests already in flight"
+        )
     
     # Individual dialogue processing
     st.subheader("Individual Dialogue Lines")
-    
-    for i, dialogue in enumerate(st.session_state.dialogues):
-        dialogue_key = f"{dialogue['character']}_{i}"
-        
-        with st.expander(f"{dialogue['character']}: {dialogue['text'][:50]}{'...' if len(dialogue['text']) > 50 else ''}"):
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                st.markdown(f"**Character:** {dialogue['character']}")
-                st.markdown(f"**Text:** {dialogue['text']}")
-                st.markdown(f"**Scene:** {dialogue.get('scene_id', 1)}")
-                
-                # Emotion selection
-                emotions = ["neutral", "happy", "sad", "angry", "fearful", "surprised"]
-                selected_emotion = st.selectbox(
-                    "Select Emotion",
-                    options=emotions,
-                    index=emotions.index(dialogue.get("emotion", "neutral")),
-                    key=f"emotion_select_{i}"
-                )
+    st.toggle(
+        "Stream Audio",
+        key="stream_tts",
+        help="Start playing a line while it is still being generated"
+    )
+
+    dialogues = st.session_state.dialogues
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+
+    with filter_col1:
+        scene_ids = sorted(dialogues.frame["scene_id"].unique().tolist())
+        scene_filter = st.selectbox(
+            "Scene",
+            options=[None] + scene_ids,
+            format_func=lambda x: "All Scenes" if x is None else f"Scene {x}"
+        )
+
+    with filter_col2:
+        characters = dialogues.frame["character"].cat.categories.tolist()
+        character_filter = st.selectbox(
+            "Character",
+            options=[None] + characters,
+            format_func=lambda x: "All Characters" if x is None else x
+        )
+
+    with filter_col3:
+        page_size = st.selectbox("Lines per Page", options=DIALOGUE_PAGE_SIZES)
+
+    matches = dialogue_search_input("dialogue_search")
+
+    rows = dialogues.filter(scene_id=scene_filter, character=character_filter)
+    if matches is not None:
+        rows = rows[rows.index.isin(matches)]
+    if rows.empty:
+        st.info("No dialogue lines match these filters.")
+        return
+
+    page_count = (len(rows) - 1) // page_size + 1
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    st.caption(f"Showing {len(rows)} of {len(dialogues)} dialogue lines")
+
+    # Only the visible page is rendered, each line in its own fragment
+    for line_id in rows.index[(page - 1) * page_size:page * page_size]:
+        render_dialogue_line(line_id)
+
+
+def dialogue_search_input(key):
+    """Search box for dialogue; returns the matching line ids, or None without a query"""
+    query = st.text_input(
+        "Search Dialogue",
+        key=key,
+        placeholder='e.g. bomb  "much time"  SIDE*',
+        help="Lines must contain every word. End a word with * to match its prefixes, "
+             "and quote words to match them as a phrase. Searches text, characters, "
+             "emotions and scene headings."
+    )
+    if not query.strip():
+        return None
+
+    with timed("search_dialogue"):
+        return st.session_state.search_index.search(query)
+
+
+def render_audio_jobs():
+    """Show status and controls for this session's recent generation jobs"""
+    job_queue = get_audio_job_queue()
+    jobs = [job for job in map(job_queue.get, st.session_state.audio_jobs[-AUDIO_JOBS_SHOWN:]) if job is not None]
+    if not jobs:
+        return
+
+    was_active = any(job.active for job in jobs)
+    collect_audio_job_results()
+
+    for job in reversed(jobs):
+        status_col, action_col = st.columns([3, 1])
+        evicted = st.session_state.audio_job_evicted.get(job.id, 0)
+
+        with status_col:
+            st.progress(job.progress, text=(
+                f"Job {job.id} ({job.status}): {job.completed} of {job.total} lines generated"
+                + (f", {job.failed} failed" if job.failed else "")
+                + (f", {evicted} lost from the audio cache before they could be loaded" if evicted else "")
+            ))
+            if evicted and not job.active:
+                st.warning(f"{evicted} clips from job {job.id} were evicted from the audio cache; generate them again.")
+            if job.errors and not job.active:
+                with st.expander(f"Errors in job {job.id}"):
+                    for error in job.errors[:20]:
+                        st.text(error)
+
+        with action_col:
+            if job.active and st.button("Cancel", key=f"cancel_job_{job.id}"):
+                job_queue.cancel(job.id)
+
+    # Refresh the whole page once the last job finishes so line status updates
+    if was_active and not any(job.active for job in jobs):
+        st.rerun()
+
+
+# Polls every second while jobs run, without rerunning the rest of the page
+render_audio_jobs_live = st.fragment(run_every=1)(render_audio_jobs)
+
+
+@st.fragment
+def render_dialogue_line(dialogue_key):
+    """Render one dialogue line's controls
+
+    Runs as a fragment, so changing the emotion or generating audio reruns
+    only this line instead of the whole page.
+    """
+    dialogue = st.session_state.dialogues.get(dialogue_key)
+
+    with st.expander(f"{dialogue['character']}: {dialogue['text'][:50]}{'...' if len(dialogue['text']) > 50 else ''}"):
+        col1, col2 = st.columns([3, 1])
+
+        with col1:
+            st.markdown(f"**Character:** {dialogue['character']}")
+            st.markdown(f"**Text:** {dialogue['text']}")
+            st.markdown(f"**Scene:** {dialogue.get('scene_id', 1)}")
+
+            # Emotion selection
+            selected_emotion = st.selectbox(
+                "Select Emotion",
+                options=EMOTIONS,
+                index=EMOTIONS.index(dialogue.get("emotion", "neutral")),
+                key=f"emotion_select_{dialogue_key}"
+            )
+            if selected_emotion != dialogue["emotion"]:
+                st.session_state.dialogues.set_emotion(dialogue_key, selected_emotion)
                 dialogue["emotion"] = selected_emotion
-            
-            with col2:
-                # Generate button for this line
-                if st.button("Generate Audio", key=f"gen_btn_{i}"):
-                    audio_url = generate_audio_for_line(
-                        dialogue["character"], 
-                        dialogue["text"], 
+                st.session_state.search_index.add(dialogue_key, dialogue)
+
+        with col2:
+            # Generate button for this line
+            if st.button("Generate Audio", key=f"gen_btn_{dialogue_key}"):
+                generate = stream_audio_for_line if st.session_state.get("stream_tts") else generate_audio_for_line
+                try:
+                    audio_url = generate(
+                        dialogue["character"],
+                        dialogue["text"],
                         dialogue["emotion"]
                     )
-                    
-                    st.session_state.audio_clips[dialogue_key] = {
-                        "url": audio_url,
-                        "character": dialogue["character"],
-                        "text": dialogue["text"],
-                        "emotion": dialogue["emotion"],
-                        "scene_id": dialogue.get("scene_id", 1)
-                    }
-                    
+                except (ProviderError, requests.RequestException) as e:
+                    # An open circuit or a throttled provider is an ordinary outcome here
+                    st.error(f"Could not generate audio: {e}")
+                else:
+                    voice_id = st.session_state.character_voices.get(dialogue["character"], "voice1")
+                    store_audio_clip(dialogue_key, make_audio_clip(dialogue, audio_url, voice_id))
+
+                    # The user is likely working down the script, so prepare the next lines
+                    dialogues = st.session_state.dialogues
+                    prefetch_audio(
+                        f"line:{dialogue_key}",
+                        dialogues.records(dialogues.following(dialogue_key, PREFETCH_AHEAD_LINES))
+                    )
+
                     st.success("Audio generated!")
-                    st.rerun()
-                
-                # Display audio if available
-                if dialogue_key in st.session_state.audio_clips:
-                    audio_data = st.session_state.audio_clips[dialogue_key]
-                    display_audio_player(audio_data["url"], audio_data["character"], audio_data["text"][:30] + "...")
+
+            # Display audio if available
+            if dialogue_key in st.session_state.audio_clips:
+                audio_data = st.session_state.audio_clips[dialogue_key]
+                display_audio_player(clip_audio(audio_data), audio_data["character"], audio_data["text"][:30] + "...")
 
 
 def scene_playback_page():
     """Page for playing back scenes with generated audio"""
     st.header("Scene Playback")
     
-    if not st.session_state.audio_clips:
-        st.warning("Please generate audio for dialogue lines first.")
-        return
-    
     if not st.session_state.script_analysis:
         st.warning("Please upload and process a script first.")
         return
     
-    # Scene selection
-    scenes = st.session_state.script_analysis.get("scenes", [])
-    scene_options = [f"Scene {scene['id']}: {scene['name']}" for scene in scenes]
-    
-    if not scene_options:
-        scene_options = ["All Dialogue"]
+    # Scene selection, including scenes that only the dialogue parser found
+    scene_index = st.session_state.scene_index
+    scene_names = {scene['id']: scene['name'] for scene in st.session_state.script_analysis.get("scenes", [])}
+    scene_ids = sorted(
+        set(scene_names) | set(scene_index.scene_ids())
+        | set(st.session_state.dialogues.frame["scene_id"].unique().tolist())
+    )
     
-    selected_scene = st.selectbox(
+    scene_id = st.selectbox(
         "Select Scene to Play",
-        options=["All Dialogue"] + scene_options
+        options=[None] + scene_ids,
+        format_func=lambda x: "All Dialogue" if x is None else f"Scene {x}: {scene_names.get(x, 'Untitled')}"
     )
     
-    # Filter audio clips by scene if needed
-    scene_id = None
-    if selected_scene != "All Dialogue":
-        scene_id = int(selected_scene.split(":")[0].replace("Scene ", ""))
+    # Get the opened scene's lines ready while the user listens
+    if scene_id is None:
+        get_audio_prefetcher().cancel(st.session_state.session_id)
+    else:
+        dialogues = st.session_state.dialogues
+        if prefetch_audio(f"scene:{scene_id}", dialogues.records(dialogues.filter(scene_id=scene_id))):
+            render_prefetch_status_live()
     
     # Display playback controls
     st.subheader("Playback")
     
-    # Get dialogue clips for selected scene
-    scene_clips = []
-    for key, clip in st.session_state.audio_clips.items():
-        if scene_id is None or clip.get("scene_id") == scene_id:
-            scene_clips.append(clip)
-    
-    # Sort clips (this would be by timestamp/order in real implementation)
-    scene_clips = sorted(scene_clips, key=lambda x: x.get("scene_id", 0))
+    # Get dialogue clips for selected scene, in script order
+    line_ids = scene_index.line_ids(scene_id)
+    scene_clips = [st.session_state.audio_clips[line_id] for line_id in line_ids]
     
     if not scene_clips:
         st.info("No audio clips available for this scene.")
         return
     
+    # Apply each clip's Advanced Options, rendering the whole scene at once
+    try:
+        with st.spinner("Applying audio effects..."):
+            rendered_clips = render_clip_effects(scene_clips)
+    except (ValueError, wave.Error) as e:
+        st.error(f"Could not apply audio effects: {e}")
+        rendered_clips = scene_clips
+    
+    gap_ms = st.slider("Gap Between Lines (ms)", min_value=0, max_value=2000, value=400, step=50)
+    
     # Play all button
     if st.button("Play All Scene Audio"):
-        st.info("In a production version, this would play all audio clips sequentially.")
-        
-        # In production, this would use JavaScript to chain audio playback
-        for clip in scene_clips:
-            with st.expander(f"{clip['character']}", expanded=True):
-                display_audio_player(clip["url"], clip["character"], clip["text"])
+        try:
+            with st.spinner("Assembling scene audio..."):
+                track_path = get_scene_track(rendered_clips, gap_ms)
+        except (ValueError, wave.Error) as e:
+            st.error(f"Could not assemble scene audio: {e}")
+        else:
+            st.audio(track_path, format='audio/wav')
+            st.caption(f"{len(scene_clips)} lines, {gap_ms} ms between lines")
     
     # Individual clip playback
     st.subheader("Scene Dialogue")
-    for clip in scene_clips:
+    scene_lines = list(zip(line_ids, scene_clips, rendered_clips))
+    matches = dialogue_search_input("playback_search")
+    if matches is not None:
+        matches = set(matches)
+        scene_lines = [line for line in scene_lines if line[0] in matches]
+        st.caption(f"{len(scene_lines)} of {len(line_ids)} lines match")
+    
+    for line_id, clip, rendered in scene_lines:
         with st.expander(f"{clip['character']}: {clip['text'][:50]}{'...' if len(clip['text']) > 50 else ''}"):
             st.markdown(f"**Character:** {clip['character']}")
             st.markdown(f"**Emotion:** {clip['emotion']}")
             st.markdown(f"**Text:** {clip['text']}")
-            display_audio_player(clip["url"], clip["character"], clip["text"])
+            display_audio_player(clip_audio(rendered), clip["character"], clip["text"])
             
-            # In production version, options to adjust timing, add SFX, etc.
-            if st.checkbox("Show Advanced Options", key=f"adv_opt_{clip['character']}_{hash(clip['text'][:20])}"):
-                st.slider("Speed", min_value=0.5, max_value=2.0, value=1.0, step=0.1)
-                st.slider("Volume", min_value=0.0, max_value=1.0, value=1.0, step=0.1)
-                st.multiselect("Background SFX", options=["None", "Rain", "City Noise", "Wind", "Crowd"])
+            if st.checkbox("Show Advanced Options", key=f"adv_opt_{line_id}"):
+                effects = normalize_effects(clip.get("effects"))
+                speed = st.slider(
+                    "Speed", min_value=0.5, max_value=2.0, value=effects["speed"], step=0.1,
+                    key=f"speed_{line_id}"
+                )
+                volume = st.slider(
+                    "Volume", min_value=0.0, max_value=1.0, value=effects["volume"], step=0.1,
+                    key=f"volume_{line_id}"
+                )
+                sfx = st.multiselect(
+                    "Background SFX", options=["None"] + list(SFX_BED_SHAPES), default=effects["sfx"],
+                    key=f"sfx_{line_id}"
+                )
+                
+                changed = normalize_effects({"speed": speed, "volume": volume, "sfx": sfx})
+                if changed != effects:
+                    store_audio_clip(line_id, {**clip, "effects": changed})
+                    st.rerun()
 
 
 def project_management_page():
@@ -568,73 +3458,201 @@ def project_management_page():
     # View saved projects
     st.subheader("Saved Projects")
     
-    if not st.session_state.projects:
+    project_store = get_project_store()
+    projects = project_store.list_projects()
+
+    if not projects:
         st.info("No saved projects yet.")
     else:
-        for i, project in enumerate(st.session_state.projects):
+        for project in projects:
             with st.expander(f"{project['name']} - {project['date']}"):
                 st.markdown(f"**Script:** {project['script_name']}")
-                st.markdown(f"**Characters:** {len(project.get('analysis', {}).get('characters', []))}")
-                st.markdown(f"**Audio Clips:** {len(project.get('audio_clips', {}))}")
+                st.markdown(f"**Characters:** {project['character_count']}")
+                st.markdown(f"**Audio Clips:** {project['clip_count']}")
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    if st.button("Load Project", key=f"load_project_{i}"):
-                        st.session_state.current_script = type('obj', (object,), {'name': project['script_name']})
-                        st.session_state.script_analysis = project['analysis']
-                        st.session_state.dialogues = project['dialogues']
-                        st.session_state.audio_clips = project['audio_clips']
-                        st.session_state.character_voices = project['character_voices']
-                        
-                        st.success(f"Project '{project['name']}' loaded successfully!")
-                        st.rerun()
+                    if st.button("Load Project", key=f"load_project_{project['id']}"):
+                        if load_saved_project(project['id']) is None:
+                            st.error(f"Project '{project['name']}' no longer exists.")
+                        else:
+                            st.success(f"Project '{project['name']}' loaded successfully!")
+                            st.rerun()
                 
                 with col2:
-                    if st.button("Delete Project", key=f"delete_project_{i}"):
-                        st.session_state.projects.pop(i)
+                    if st.button("Delete Project", key=f"delete_project_{project['id']}"):
+                        project_store.delete_project(project['id'])
                         st.success(f"Project deleted!")
                         st.rerun()
     
-    # Export/Import functionality (simplified for demo)
+    # Export/Import functionality
     st.subheader("Export/Import")
     
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("Export Current Project", disabled=st.session_state.current_script is None):
-            # In production, this would create a downloadable JSON file
-            st.info("In production, this would allow downloading the project as a JSON file.")
+            with st.spinner("Writing project archive..."):
+                archive_path = export_current_project(project_name)
+
+            try:
+                # Writing the archive is streamed, but Streamlit's download
+                # button holds the whole file in memory to serve it
+                with open(archive_path, 'rb') as archive_file:
+                    st.download_button(
+                        "Download Project Archive",
+                        data=archive_file,
+                        file_name=f"{project_name}.srproj",
+                        mime="application/zip"
+                    )
+            finally:
+                os.remove(archive_path)
     
     with col2:
-        uploaded_file = st.file_uploader("Import Project", type=['json'])
+        uploaded_file = st.file_uploader("Import Project", type=['srproj', 'zip'])
         
         if uploaded_file is not None:
-            if st.button("Load Imported Project"):
-                # In production, this would parse the JSON file and load the project
-                st.info("In production, this would load the project from the uploaded JSON file.")
+            try:
+                archive = ProjectArchive(uploaded_file)
+            except (zipfile.BadZipFile, KeyError, ValueError) as e:
+                st.error(f"Could not read project archive: {e}")
+            else:
+                manifest = archive.manifest
+                st.caption(
+                    f"**{manifest['name']}** ({manifest.get('script_name', 'Untitled')}): "
+                    f"{manifest.get('dialogue_count', 0)} dialogue lines, {manifest.get('clip_count', 0)} audio clips"
+                )
+
+                if st.button("Load Imported Project"):
+                    with st.spinner("Importing project..."):
+                        project_id = import_project_archive(archive)
+                        name = load_saved_project(project_id)
+                    archive.close()
+
+                    st.success(f"Project '{name}' imported successfully!")
+                    st.rerun()
 
 
 # Main app
+def diagnostics_page():
+    """Page showing where time goes in this session and across the server"""
+    st.header("Diagnostics")
+
+    if timing_registry.enabled:
+        st.success("Recording timings for every session on this server.")
+        if st.button("Stop Recording"):
+            timing_registry.enabled = False
+            st.rerun()
+    else:
+        st.info("Timings are not being recorded.")
+        if st.button("Start Recording"):
+            timing_registry.enabled = True
+            st.rerun()
+
+    scope = st.radio("Scope", ["This session", "All sessions"], horizontal=True)
+    registry = st.session_state.timings if scope == "This session" else timing_registry
+    snapshot = registry.snapshot()
+
+    if not snapshot:
+        st.info("No timings recorded yet.")
+        return
+
+    summary = pd.DataFrame([
+        {
+            "Span": name,
+            "Calls": histogram["count"],
+            "p50 (ms)": histogram["p50_seconds"] * 1000,
+            "p95 (ms)": histogram["p95_seconds"] * 1000,
+            "Max (ms)": histogram["max_seconds"] * 1000,
+            "Total (s)": histogram["total_seconds"],
+            "Payload (KB)": histogram["total_bytes"] / 1024,
+            "Cache Hit Rate": (
+                histogram["cache_hits"] / (histogram["cache_hits"] + histogram["cache_misses"])
+                if histogram["cache_hits"] + histogram["cache_misses"] else None
+            ),
+        }
+        for name, histogram in snapshot.items()
+    ])
+    st.dataframe(
+        summary,
+        hide_index=True,
+        column_config={
+            "p50 (ms)": st.column_config.NumberColumn(format="%.1f"),
+            "p95 (ms)": st.column_config.NumberColumn(format="%.1f"),
+            "Max (ms)": st.column_config.NumberColumn(format="%.1f"),
+            "Total (s)": st.column_config.NumberColumn(format="%.2f"),
+            "Payload (KB)": st.column_config.NumberColumn(format="%.1f"),
+            "Cache Hit Rate": st.column_config.NumberColumn(format="percent"),
+        }
+    )
+
+    # p50/p95 are bucket upper bounds, so the histogram is shown as well
+    span_name = st.selectbox("Span", list(snapshot))
+    buckets = snapshot[span_name]["buckets"]
+    st.dataframe(
+        pd.DataFrame({
+            "Duration": [f"≤ {float(bound) * 1000:g} ms" if bound != "+Inf" else f"> {TIMING_BUCKETS[-1]:g} s"
+                         for bound in buckets],
+            "Calls": list(buckets.values()),
+        }),
+        hide_index=True,
+        column_config={
+            "Calls": st.column_config.ProgressColumn(
+                format="%d", min_value=0, max_value=max(buckets.values())
+            )
+        }
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            "Export JSON",
+            data=json.dumps(snapshot, indent=2),
+            file_name="script_reader_timings.json",
+            mime="application/json"
+        )
+    with col2:
+        st.download_button(
+            "Export Prometheus",
+            data=registry.to_prometheus(),
+            file_name="script_reader_timings.prom",
+            mime="text/plain"
+        )
+    with col3:
+        if st.button("Reset Timings"):
+            registry.reset()
+            st.rerun()
+
+
 def main():
     """Main application function"""
     # Header with logo
     st.title("🎬 AI Script Reader Platform")
     
+    # Pick up clips from background jobs so every page sees them
+    collect_audio_job_results()
+    collect_prefetched_audio()
+    
     # Get current menu selection
     menu = sidebar_menu()
+
+    # Prefetched lines are only useful while the user stays where they were queued
+    if menu not in ("Audio Generation", "Scene Playback"):
+        get_audio_prefetcher().cancel(st.session_state.session_id)
     
     # Display selected page
-    if menu == "Upload Script":
-        upload_script_page()
-    elif menu == "Script Analysis":
-        script_analysis_page()
-    elif menu == "Audio Generation":
-        audio_generation_page()
-    elif menu == "Scene Playback":
-        scene_playback_page()
-    elif menu == "Project Management":
-        project_management_page()
+    pages = {
+        "Upload Script": upload_script_page,
+        "Script Analysis": script_analysis_page,
+        "Audio Generation": audio_generation_page,
+        "Scene Playback": scene_playback_page,
+        "Project Management": project_management_page,
+        "Diagnostics": diagnostics_page,
+    }
+    page = pages[menu]
+    with timed(page.__name__):
+        page()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+"""Errors raised by the shared provider transports
+
+These live here rather than in main.py, because Streamlit re-executes
+main.py as `__main__` on every rerun and so redefines its classes. The
+transports are cached across reruns and would raise the first run's
+classes, which a later run's `except ProviderError` wouldn't catch.
+"""
+
+
+class ProviderError(Exception):
+    """A provider call failed or was refused"""
+
+
+class CircuitOpenError(ProviderError):
+    """The provider's circuit breaker is open, so the call wasn't attempted"""
@@ -0,0 +1,80 @@
+"""Tests for the screenplay tokenizer behind the mock dialogue extraction"""
+from benchmarks.screenplay_generator import _screenplay_lines, generate_screenplay
+from main import OpenAIClient, parse_character_cue, tokenize_screenplay
+
+
+def tokens(script):
+    return list(tokenize_screenplay(script))
+
+
+def speeches(script):
+    return [(d["character"], d["text"]) for d in OpenAIClient().extract_dialogue(script)]
+
+
+def test_cue_with_number_sign():
+    assert parse_character_cue("KID #2") == "KID #2"
+    assert speeches("KID #2\nWhere is everyone?\n\nMAN #1 (V.O.)\nGone.\n") == [
+        ("KID #2", "Where is everyone?"), ("MAN #1", "Gone.")
+    ]
+
+
+def test_cue_with_non_ascii_letters():
+    assert parse_character_cue("ÉLODIE") == "ÉLODIE"
+    assert parse_character_cue("Élodie") is None
+    assert speeches("ÉLODIE\nBonjour.\n") == [("ÉLODIE", "Bonjour.")]
+
+
+def test_transition_is_not_a_cue():
+    assert parse_character_cue("CUT TO:") is None
+    assert tokens("CUT TO:\nJohn walks.\n") == [("action", "CUT TO:"), ("action", "John walks.")]
+
+
+def test_upper_case_dialogue_right_after_a_cue():
+    assert tokens("JOHN\nNO\nStop it.\n") == [
+        ("character", "JOHN"), ("dialogue", "NO"), ("dialogue", "Stop it.")
+    ]
+
+
+def test_upper_case_dialogue_inside_a_speech():
+    assert speeches("JOHN\nWait.\nNO\nStop it.\n\nHe runs.\n") == [("JOHN", "Wait. NO Stop it.")]
+
+
+def test_blank_line_ends_a_speech():
+    assert tokens("JOHN\nHello.\n\nHe leaves.\n")[-1] == ("action", "He leaves.")
+
+
+def test_cue_after_speech_without_blank_lines():
+    # Text extracted from PDFs has no blank lines between elements
+    assert speeches("INT. BAR - NIGHT\nJOHN\nHello.\nSARAH\n(quietly)\nHi.\n") == [
+        ("JOHN", "Hello."), ("SARAH", "Hi.")
+    ]
+
+
+def test_indent_ends_a_speech():
+    script = (
+        "INT. BAR - NIGHT\n"
+        "                      JOHN\n"
+        "          Hello there.\n"
+        "He leaves the bar.\n"
+        "                      SARAH\n"
+        "          NO\n"
+        "          Come back.\n"
+    )
+    assert tokens(script) == [
+        ("scene_heading", "INT. BAR - NIGHT"),
+        ("character", "JOHN"),
+        ("dialogue", "Hello there."),
+        ("action", "He leaves the bar."),
+        ("character", "SARAH"),
+        ("dialogue", "NO"),
+        ("dialogue", "Come back."),
+    ]
+
+
+def test_indented_script_without_blank_lines_matches_plain_script():
+    # The generated PDF's text: indented elements, no blank lines
+    indented = "\n".join(" " * indent + text for indent, text in _screenplay_lines(20, 0) if text)
+    plain = generate_screenplay(20)
+
+    assert any(character == "KID #2" for character, _ in speeches(plain))
+    assert speeches(indented) == speeches(plain)